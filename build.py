@@ -3,130 +3,183 @@
 Script de build mejorado para SoundBoard Manager
 Crea versión portable y versión instalable
 """
+import argparse
+import hashlib
 import subprocess
 import sys
 import shutil
+import venv
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
 
-def install_pyinstaller():
-    """Instala PyInstaller si no está disponible"""
+APP_NAME = "SoundBoard Manager"
+APP_VERSION = "1.0.0"
+
+PROJECT_DIR = Path(__file__).parent
+SPEC_FILE = PROJECT_DIR / "soundboard.spec"
+# Entorno aislado: PyInstaller solo ve las dependencias de requirements.txt
+BUILD_VENV = PROJECT_DIR / ".build-venv"
+# UPX opcional: se usa solo si hay un upx.exe fijado en tools/upx/
+UPX_DIR = PROJECT_DIR / "tools" / "upx"
+# Cachés persistentes (pip y PyInstaller); sobreviven a --fresh
+CACHE_DIR = PROJECT_DIR / ".cache"
+
+# Variantes de build: modo -> (nombre del ejecutable, etiqueta)
+# Los nombres deben coincidir con TARGETS en soundboard.spec
+BUILD_TARGETS = {
+    "portable": ("SoundBoardManager-Portable", "portable"),
+    "installer": ("SoundBoardManager", "instalable"),
+}
+
+def pip_env():
+    """Entorno para pip con caché de descargas persistente"""
+    return {**os.environ, "PIP_CACHE_DIR": str(CACHE_DIR / "pip")}
+
+def venv_python():
+    """Ruta del intérprete del entorno de build"""
+    if os.name == 'nt':
+        return BUILD_VENV / "Scripts" / "python.exe"
+    return BUILD_VENV / "bin" / "python"
+
+def ensure_build_venv():
+    """Crea el virtualenv de build, o lo reutiliza si requirements.txt no cambió"""
+    requirements = PROJECT_DIR / "requirements.txt"
+    req_hash = hashlib.sha256(requirements.read_bytes()).hexdigest()
+    stamp = BUILD_VENV / ".requirements-hash"
+    python = venv_python()
+
+    if python.exists() and stamp.exists() and stamp.read_text().strip() == req_hash:
+        print(f"✓ Entorno de build reutilizado: {BUILD_VENV}")
+        return True
+
+    print(f"Creando entorno de build en {BUILD_VENV}...")
     try:
-        import PyInstaller
-        print(f"✓ PyInstaller encontrado: {PyInstaller.__version__}")
+        venv.EnvBuilder(with_pip=True, clear=True).create(BUILD_VENV)
+        subprocess.run([str(python), "-m", "pip", "install", "-r", str(requirements), "pyinstaller"],
+                       check=True, env=pip_env())
+        stamp.write_text(req_hash)
+        print("✓ Entorno de build listo")
         return True
-    except ImportError:
-        print("✗ PyInstaller no encontrado")
-        print("  Instalando PyInstaller...")
-        try:
-            subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
-            print("✓ PyInstaller instalado")
-            return True
-        except Exception as e:
-            print(f"✗ Error instalando PyInstaller: {e}")
-            return False
+    except Exception as e:
+        print(f"✗ Error creando entorno de build: {e}")
+        return False
 
-def build_portable():
-    """Construye la versión portable (un solo .exe)"""
-    print("\n" + "=" * 60)
-    print("CONSTRUYENDO VERSIÓN PORTABLE")
-    print("=" * 60)
-    
-    project_dir = Path(__file__).parent
-    icon_file = project_dir / "src" / "assets" / "icon.ico"
-    
-    args = [
-        sys.executable,
-        "-m", "PyInstaller",
-        "--name", "SoundBoardManager-Portable",
-        "--onefile",
-        "--windowed",
-        "--noconfirm",
-        "--clean",
-        "--distpath", "dist/portable",
-        "--workpath", "build/portable",
-        "--specpath", "build",
-    ]
-    
-    if icon_file.exists():
-        args.extend(["--icon", str(icon_file)])
-    
-    args.extend([
-        "--add-data", f"{project_dir / 'src' / 'assets'}{os.pathsep}assets",
-        "--hidden-import", "pycaw",
-        "--hidden-import", "keyboard",
-        "--hidden-import", "comtypes",
-        "--hidden-import", "psutil",
-        "--hidden-import", "win32gui",
-        "--hidden-import", "win32con",
-        "--hidden-import", "win32api",
-        "--hidden-import", "pystray",
-        "--hidden-import", "PIL",
-        "--hidden-import", "PySide6",
-        str(project_dir / "src" / "__main__.py"),
-    ])
-    
+def install_pyinstaller():
+    """Instala PyInstaller en el entorno de build si no está disponible"""
+    python = str(venv_python())
+    result = subprocess.run([python, "-c", "import PyInstaller; print(PyInstaller.__version__)"],
+                            capture_output=True, text=True)
+    if result.returncode == 0:
+        print(f"✓ PyInstaller encontrado: {result.stdout.strip()}")
+        return True
+    print("✗ PyInstaller no encontrado")
+    print("  Instalando PyInstaller...")
     try:
-        subprocess.run(args, check=True)
-        exe_file = project_dir / "dist" / "portable" / "SoundBoardManager-Portable.exe"
-        if exe_file.exists():
-            size_mb = exe_file.stat().st_size / (1024 * 1024)
-            print(f"\n✓ Versión portable creada: {exe_file}")
-            print(f"  Tamaño: {size_mb:.2f} MB")
-            return True
-    except subprocess.CalledProcessError as e:
-        print(f"\n✗ Error creando versión portable: {e}")
+        subprocess.run([python, "-m", "pip", "install", "pyinstaller"], check=True, env=pip_env())
+        print("✓ PyInstaller instalado")
+        return True
+    except Exception as e:
+        print(f"✗ Error instalando PyInstaller: {e}")
         return False
 
-def build_installer():
-    """Construye la versión instalable (carpeta con archivos)"""
-    print("\n" + "=" * 60)
-    print("CONSTRUYENDO VERSIÓN INSTALABLE")
-    print("=" * 60)
-    
-    project_dir = Path(__file__).parent
-    icon_file = project_dir / "src" / "assets" / "icon.ico"
-    
+def _build(mode):
+    """Comando PyInstaller de una variante sobre el spec compartido (soundboard.spec)"""
     args = [
-        sys.executable,
+        str(venv_python()),
         "-m", "PyInstaller",
-        "--name", "SoundBoardManager",
-        "--onedir",  # Carpeta en lugar de un solo archivo
-        "--windowed",
         "--noconfirm",
-        "--clean",
-        "--distpath", "dist/installer",
-        "--workpath", "build/installer",
-        "--specpath", "build",
+        "--distpath", f"dist/{mode}",
+        "--workpath", f"build/{mode}",
     ]
-    
-    if icon_file.exists():
-        args.extend(["--icon", str(icon_file)])
-    
-    args.extend([
-        "--add-data", f"{project_dir / 'src' / 'assets'}{os.pathsep}assets",
-        "--hidden-import", "pycaw",
-        "--hidden-import", "keyboard",
-        "--hidden-import", "comtypes",
-        "--hidden-import", "psutil",
-        "--hidden-import", "win32gui",
-        "--hidden-import", "win32con",
-        "--hidden-import", "win32api",
-        "--hidden-import", "pystray",
-        "--hidden-import", "PIL",
-        "--hidden-import", "PySide6",
-        str(project_dir / "src" / "__main__.py"),
-    ])
-    
-    try:
-        subprocess.run(args, check=True)
-        exe_file = project_dir / "dist" / "installer" / "SoundBoardManager" / "SoundBoardManager.exe"
-        if exe_file.exists():
-            print(f"\n✓ Versión instalable creada: {exe_file.parent}")
-            return True
-    except subprocess.CalledProcessError as e:
-        print(f"\n✗ Error creando versión instalable: {e}")
+    # UPX explícito: sin depender de si hay un upx.exe suelto en el PATH.
+    # Con un .spec no vale --noupx; si no hay upx.exe lo desactiva el propio spec
+    if (UPX_DIR / "upx.exe").exists():
+        args.extend(["--upx-dir", str(UPX_DIR)])
+    args.append(str(SPEC_FILE))
+    return args
+
+def _exe_path(mode):
+    """Ruta del ejecutable generado para una variante"""
+    name, _ = BUILD_TARGETS[mode]
+    return PROJECT_DIR / "dist" / mode / name / f"{name}.exe"
+
+def _zip_path(mode):
+    """Ruta del .zip de la variante portable (lo crea finish_build)"""
+    return _exe_path(mode).parent.with_suffix(".zip")
+
+def finish_build(mode):
+    """Comprueba el resultado de una variante; la portable se empaqueta en un .zip"""
+    _, label = BUILD_TARGETS[mode]
+    exe_file = _exe_path(mode)
+    if not exe_file.exists():
+        print(f"\n✗ Error creando versión {label}: no se encontró {exe_file}")
         return False
+    if mode == "portable":
+        # Un único .zip para distribuir; se descomprime una vez, no en cada arranque
+        app_dir = exe_file.parent
+        zip_file = shutil.make_archive(str(app_dir), "zip", root_dir=app_dir.parent, base_dir=app_dir.name)
+        size_mb = Path(zip_file).stat().st_size / (1024 * 1024)
+        print(f"\n✓ Versión {label} creada: {exe_file}")
+        print(f"  Archivo: {zip_file} ({size_mb:.2f} MB)")
+    else:
+        print(f"\n✓ Versión {label} creada: {exe_file.parent}")
+    return True
+
+def clear_stale_bytecode():
+    """Borra __pycache__ de src/ para que PyInstaller no reutilice .pyc sin optimizar"""
+    for cache_dir in (PROJECT_DIR / "src").rglob("__pycache__"):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def sources_hash():
+    """Hash del código, los assets, el spec, las dependencias y el UPX que entran en el bundle"""
+    h = hashlib.blake2b(digest_size=16)
+    src_dir = PROJECT_DIR / "src"
+    files = sorted(src_dir.rglob("*.py")) + sorted((src_dir / "assets").rglob("*"))
+    # upx.exe cambia los argumentos de PyInstaller: su presencia (y versión) cuenta
+    files += [SPEC_FILE, PROJECT_DIR / "requirements.txt", UPX_DIR / "upx.exe"]
+    for path in files:
+        if path.is_file():
+            h.update(path.relative_to(PROJECT_DIR).as_posix().encode())
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+def run_build(mode, force=False):
+    """Ejecuta PyInstaller para una variante y comprueba el resultado.
+
+    Ambas variantes usan soundboard.spec (SOUNDBOARD_BUILD_MODE la elige) y
+    pueden correr a la vez: escriben en distpath/workpath distintos y cada una
+    usa su propio PYINSTALLER_CONFIG_DIR para no corromper la caché. El
+    bytecode se compila con PYTHONOPTIMIZE=2.
+    """
+    _, label = BUILD_TARGETS[mode]
+    stamp = PROJECT_DIR / "build" / mode / ".build-hash"
+    current_hash = sources_hash()
+    outputs = [_exe_path(mode)]
+    if mode == "portable":
+        outputs.append(_zip_path(mode))
+    if not force and all(path.exists() for path in outputs) and stamp.exists() \
+            and stamp.read_text().strip() == current_hash:
+        print(f"\n✓ Versión {label}: sin cambios, se omite la build")
+        return True
+
+    print(f"\n[BUILD] Construyendo versión {label}...")
+    env = {
+        **os.environ,
+        "SOUNDBOARD_BUILD_MODE": mode,
+        "PYTHONOPTIMIZE": "2",  # .pyc sin asserts ni docstrings
+        "PYINSTALLER_CONFIG_DIR": str(CACHE_DIR / f"pyinstaller-{mode}"),
+    }
+    proc = subprocess.Popen(_build(mode), env=env)
+    code = proc.wait()
+    if code != 0:
+        print(f"\n✗ PyInstaller ({mode}) terminó con código {code}")
+        return False
+    if not finish_build(mode):
+        return False
+    stamp.parent.mkdir(parents=True, exist_ok=True)
+    stamp.write_text(current_hash)
+    return True
 
 def create_nsis_script():
     """Crea el script NSIS para el instalador"""
@@ -134,100 +187,17 @@ def create_nsis_script():
     print("CREANDO SCRIPT DE INSTALADOR")
     print("=" * 60)
     
-    project_dir = Path(__file__).parent
-    nsis_script = project_dir / "installer.nsi"
-    
-    script_content = '''
-; SoundBoard Manager - Script de instalación NSIS
-; Requiere NSIS 3.0 o superior
-
-!define APPNAME "SoundBoard Manager"
-!define COMPANYNAME "SoundBoard"
-!define DESCRIPTION "Lightweight volume mixer for Windows"
-!define VERSIONMAJOR 1
-!define VERSIONMINOR 0
-!define VERSIONBUILD 0
-!define INSTALLSIZE 30000
-
-RequestExecutionLevel admin
-InstallDir "$PROGRAMFILES\\${APPNAME}"
-Name "${APPNAME}"
-Icon "src\\assets\\icon.ico"
-outFile "dist\\SoundBoardManager-Setup.exe"
-
-!include LogicLib.nsh
-!include "MUI2.nsh"
-
-!define MUI_ABORTWARNING
-!define MUI_ICON "src\\assets\\icon.ico"
-!define MUI_UNICON "src\\assets\\icon.ico"
-
-!insertmacro MUI_PAGE_WELCOME
-!insertmacro MUI_PAGE_DIRECTORY
-!insertmacro MUI_PAGE_INSTFILES
-!insertmacro MUI_PAGE_FINISH
-
-!insertmacro MUI_UNPAGE_CONFIRM
-!insertmacro MUI_UNPAGE_INSTFILES
-
-!insertmacro MUI_LANGUAGE "Spanish"
-!insertmacro MUI_LANGUAGE "English"
-
-Section "install"
-    SetOutPath $INSTDIR
-    
-    ; Copiar archivos
-    File /r "dist\\installer\\SoundBoardManager\\*.*"
-    
-    ; Crear acceso directo en el menú inicio
-    CreateDirectory "$SMPROGRAMS\\${APPNAME}"
-    CreateShortCut "$SMPROGRAMS\\${APPNAME}\\${APPNAME}.lnk" "$INSTDIR\\SoundBoardManager.exe"
-    CreateShortCut "$SMPROGRAMS\\${APPNAME}\\Uninstall.lnk" "$INSTDIR\\uninstall.exe"
-    
-    ; Crear acceso directo en el escritorio (opcional)
-    CreateShortCut "$DESKTOP\\${APPNAME}.lnk" "$INSTDIR\\SoundBoardManager.exe"
-    
-    ; Registro para agregar/quitar programas
-    WriteRegStr HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "DisplayName" "${APPNAME}"
-    WriteRegStr HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "UninstallString" "$INSTDIR\\uninstall.exe"
-    WriteRegStr HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "InstallLocation" "$INSTDIR"
-    WriteRegStr HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "Publisher" "${COMPANYNAME}"
-    WriteRegStr HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "DisplayIcon" "$INSTDIR\\SoundBoardManager.exe"
-    WriteRegStr HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "DisplayVersion" "${VERSIONMAJOR}.${VERSIONMINOR}.${VERSIONBUILD}"
-    WriteRegDWORD HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "VersionMajor" ${VERSIONMAJOR}
-    WriteRegDWORD HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "VersionMinor" ${VERSIONMINOR}
-    WriteRegDWORD HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "NoModify" 1
-    WriteRegDWORD HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "NoRepair" 1
-    WriteRegDWORD HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}" "EstimatedSize" ${INSTALLSIZE}
-    
-    ; Iniciar con Windows (HKCU Run)
-    WriteRegStr HKCU "Software\\Microsoft\\Windows\\CurrentVersion\\Run" "${APPNAME}" "$INSTDIR\\SoundBoardManager.exe"
-    
-    ; Crear desinstalador
-    WriteUninstaller "$INSTDIR\\uninstall.exe"
-SectionEnd
-
-Section "uninstall"
-    ; Eliminar archivos
-    RMDir /r "$INSTDIR"
-    
-    ; Eliminar accesos directos
-    Delete "$SMPROGRAMS\\${APPNAME}\\${APPNAME}.lnk"
-    Delete "$SMPROGRAMS\\${APPNAME}\\Uninstall.lnk"
-    RMDir "$SMPROGRAMS\\${APPNAME}"
-    Delete "$DESKTOP\\${APPNAME}.lnk"
-    
-    ; Eliminar del inicio automático
-    DeleteRegValue HKCU "Software\\Microsoft\\Windows\\CurrentVersion\\Run" "${APPNAME}"
-    
-    ; Eliminar entradas del registro
-    DeleteRegKey HKLM "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\${APPNAME}"
-SectionEnd
-'''
+    nsis_template = PROJECT_DIR / "installer.nsi.in"
+    nsis_script = PROJECT_DIR / "installer.nsi"
     
     try:
-        with open(nsis_script, 'w', encoding='utf-8') as f:
-            f.write(script_content)
+        script_content = nsis_template.read_bytes()
+        # Solo reescribir si el contenido cambió
+        if nsis_script.exists() and \
+                hashlib.sha256(nsis_script.read_bytes()).hexdigest() == hashlib.sha256(script_content).hexdigest():
+            print(f"✓ Script NSIS sin cambios: {nsis_script}")
+            return True
+        nsis_script.write_bytes(script_content)
         print(f"✓ Script NSIS creado: {nsis_script}")
         print("  (Se compilará automáticamente en el siguiente paso si NSIS está instalado)")
         return True
@@ -241,8 +211,7 @@ def build_nsis_installer():
     print("COMPILANDO INSTALADOR NSIS")
     print("=" * 60)
 
-    project_dir = Path(__file__).parent
-    nsis_script = project_dir / "installer.nsi"
+    nsis_script = PROJECT_DIR / "installer.nsi"
     makensis = shutil.which("makensis")
 
     if not nsis_script.exists():
@@ -254,8 +223,14 @@ def build_nsis_installer():
         return False
 
     try:
-        subprocess.run([makensis, str(nsis_script)], check=True)
-        setup_path = project_dir / "dist" / "SoundBoardManager-Setup.exe"
+        # /V2: solo avisos y errores; /D comparte las constantes con el script
+        subprocess.run([
+            makensis, "/V2",
+            f"/DAPPNAME={APP_NAME}",
+            f"/DVERSION={APP_VERSION}",
+            str(nsis_script),
+        ], check=True)
+        setup_path = PROJECT_DIR / "dist" / "SoundBoardManager-Setup.exe"
         if setup_path.exists():
             print(f"✓ Instalador generado: {setup_path}")
             return True
@@ -271,8 +246,7 @@ def install_built_setup():
     print("INSTALANDO APLICACIÓN (SILENCIOSO)")
     print("=" * 60)
 
-    project_dir = Path(__file__).parent
-    setup_path = project_dir / "dist" / "SoundBoardManager-Setup.exe"
+    setup_path = PROJECT_DIR / "dist" / "SoundBoardManager-Setup.exe"
 
     if not setup_path.exists():
         print("✗ No se encontró dist/SoundBoardManager-Setup.exe. Ejecuta el paso de NSIS.")
@@ -286,42 +260,55 @@ def install_built_setup():
         print(f"✗ Error instalando el setup: {e}")
         return False
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build de SoundBoard Manager")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Borra dist/ y build/ antes de compilar (desactiva el build incremental)")
+    parser.add_argument("--force", action="store_true",
+                        help="Recompila aunque el código no haya cambiado desde la última build")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("=" * 60)
     print("SOUNDBOARD MANAGER - BUILD SCRIPT")
     print("=" * 60)
     
-    # Verificar PyInstaller
+    # Entorno de build aislado + PyInstaller
+    if not ensure_build_venv():
+        sys.exit(1)
     if not install_pyinstaller():
         sys.exit(1)
     
-    # Limpiar builds anteriores
-    project_dir = Path(__file__).parent
-    for path in ["dist", "build"]:
-        full_path = project_dir / path
-        if full_path.exists():
-            print(f"Limpiando {path}/...")
-            shutil.rmtree(full_path, ignore_errors=True)
+    # Limpiar builds anteriores solo si se pide; por defecto PyInstaller
+    # reutiliza el análisis y el bytecode cacheados en build/
+    if args.fresh:
+        for path in ["dist", "build"]:
+            full_path = PROJECT_DIR / path
+            if full_path.exists():
+                print(f"Limpiando {path}/...")
+                shutil.rmtree(full_path, ignore_errors=True)
     
-    success = True
-    
-    # Build portable
-    if not build_portable():
-        success = False
-    
-    # Build installer
-    if not build_installer():
-        success = False
-    
-    # Crear script NSIS
-    if not create_nsis_script():
-        success = False
-    
-    # Compilar instalador NSIS
-    if success and not build_nsis_installer():
-        success = False
+    clear_stale_bytecode()
+
+    # Builds en paralelo: el script NSIS no depende de PyInstaller y makensis
+    # solo necesita dist/installer/, así que no espera a la versión portable
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        f_nsis = executor.submit(create_nsis_script)
+        f_portable = executor.submit(run_build, "portable", args.force)
+        f_installer = executor.submit(run_build, "installer", args.force)
+
+        def compile_installer():
+            # Barrera: instalable + script NSIS listos
+            if not (f_installer.result() and f_nsis.result()):
+                return False
+            return build_nsis_installer()
+
+        f_setup = executor.submit(compile_installer)
+        results = [f.result() for f in (f_nsis, f_portable, f_installer, f_setup)]
+    success = all(results)
     
-    # Instalar automáticamente (silent)
+    # Instalar automáticamente (silent); modifica el sistema, va en serie
     if success and not install_built_setup():
         success = False
     
@@ -331,7 +318,7 @@ def main():
         print("✓ BUILD COMPLETADO")
         print("=" * 60)
         print("\nArchivos generados:")
-        print("  • Portable: dist/portable/SoundBoardManager-Portable.exe")
+        print("  • Portable: dist/portable/SoundBoardManager-Portable.zip")
         print("  • Instalable (carpeta): dist/installer/SoundBoardManager/")
         print("  • Script instalador: installer.nsi")
         print("  • Instalador NSIS: dist/SoundBoardManager-Setup.exe")
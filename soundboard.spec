@@ -0,0 +1,124 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+Spec compartido de SoundBoard Manager.
+Define una sola vez imports, datos y exclusiones para las dos variantes;
+la variante se elige con SOUNDBOARD_BUILD_MODE=portable|installer
+(lo hace build.py).
+"""
+import os
+
+MODE = os.environ.get("SOUNDBOARD_BUILD_MODE", "installer")
+TARGETS = {
+    # Portable: onedir con carpeta interna "lib" para dejar limpia la raíz
+    "portable": {"name": "SoundBoardManager-Portable", "contents_directory": "lib"},
+    "installer": {"name": "SoundBoardManager", "contents_directory": "_internal"},
+}
+target = TARGETS[MODE]
+
+src_dir = os.path.join(SPECPATH, "src")
+icon_file = os.path.join(src_dir, "assets", "icon.ico")
+
+HIDDEN_IMPORTS = [
+    # Módulos del proyecto: __main__.py los importa bajo demanda (importlib)
+    "backend",
+    "config",
+    "i18n",
+    "media_wheel",
+    "ui_qt",
+    "pycaw",
+    "keyboard",
+    "comtypes",
+    "psutil",
+    "win32gui",
+    "win32con",
+    "win32api",
+    "pystray",
+    "PIL",
+    "PySide6",
+    # Se importan dentro de funciones; winloop carga _noop desde Cython
+    "orjson",
+    "watchdog.observers",
+    "winloop",
+    "winloop._noop",
+]
+# Dependencias transitivas que la app no usa (la UI es PySide6, no Tk)
+EXCLUDES = [
+    "tkinter",
+    "unittest",
+    "pydoc",
+    "test",
+    "numpy.testing",
+    "PIL.ImageQt",
+    "PySide6.QtWebEngineCore",
+    "PySide6.QtWebEngineWidgets",
+    "PySide6.QtWebEngineQuick",
+    "PySide6.Qt3DCore",
+    "PySide6.Qt3DRender",
+    "PySide6.Qt3DInput",
+    "PySide6.Qt3DLogic",
+    "PySide6.Qt3DAnimation",
+    "PySide6.Qt3DExtras",
+]
+
+a = Analysis(
+    [os.path.join(src_dir, "__main__.py")],
+    pathex=[src_dir],
+    datas=[(os.path.join(src_dir, "assets"), "assets")],
+    hiddenimports=HIDDEN_IMPORTS,
+    excludes=EXCLUDES,
+)
+
+# DLLs de Qt que arrastra PySide6 pero que un overlay QtWidgets no usa
+EXCLUDED_BINARIES = (
+    "Qt6WebEngine",
+    "Qt6Quick",
+    "Qt6Qml",
+    "Qt63D",
+    "Qt6Charts",
+    "Qt6Multimedia",
+    "Qt6Pdf",
+)
+a.binaries = [b for b in a.binaries if not any(p in b[0] for p in EXCLUDED_BINARIES)]
+# Traducciones de Qt: solo español e inglés (los idiomas del instalador NSIS)
+a.datas = [
+    d for d in a.datas
+    if not d[0].replace("\\", "/").startswith("PySide6/translations/")
+    or d[0].endswith(("_en.qm", "_es.qm"))
+]
+
+# UPX solo si está el binario del proyecto (build.py lo pasa con --upx-dir);
+# sin él no se comprime nada, aunque haya un upx.exe suelto en el PATH
+USE_UPX = os.path.exists(os.path.join(SPECPATH, "tools", "upx", "upx.exe"))
+
+# Con UPX se comprime todo (DLLs de Qt, python3xx.dll, .pyd...) salvo estos,
+# que se rompen o no ganan nada al comprimirlos
+UPX_EXCLUDE = [
+    "vcruntime140.dll",
+    "vcruntime140_1.dll",
+    "msvcp140.dll",
+    "python3.dll",
+    "qwindows.dll",  # los plugins de Qt validan sus metadatos al cargarse
+]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name=target["name"],
+    console=False,
+    upx=USE_UPX,
+    upx_exclude=UPX_EXCLUDE,
+    icon=icon_file if os.path.exists(icon_file) else None,
+    contents_directory=target["contents_directory"],
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    upx=USE_UPX,
+    upx_exclude=UPX_EXCLUDE,
+    name=target["name"],
+)
@@ -8,6 +8,8 @@ Ejecuta en background: la UI está oculta por defecto y se muestra solo al usar
 import sys
 import os
 import threading
+import importlib
+import functools
 import json
 from pathlib import Path
 
@@ -18,22 +20,50 @@ if getattr(sys, 'frozen', False):
     if hasattr(sys, '_MEIPASS'):
         # PyInstaller crea una carpeta temporal y guarda el path en _MEIPASS
         sys.path.insert(0, sys._MEIPASS)
-    # Imports absolutos
-    import media_wheel
-    import i18n
-    import ui_qt
-else:
-    # Ejecutando como script normal
-    # Imports relativos
-    try:
-        from . import media_wheel
-        from . import i18n
-        from . import ui_qt
-    except ImportError:
-        # Si falla, intentar imports absolutos
-        import media_wheel
-        import i18n
-        import ui_qt
+
+# Módulos del proyecto que se resuelven bajo demanda
+_LAZY_MODULES = ('media_wheel', 'i18n', 'ui_qt', 'config')
+
+def _load_module(name):
+    """Importa un módulo del proyecto solo cuando se necesita.
+
+    media_wheel (pycaw/comtypes/keyboard), ui_qt (PySide6) e i18n se cargan
+    bajo demanda para no pagar sus DLLs antes de tiempo en el arranque;
+    config (settings.json) no depende de Qt, así que leerla no arrastra la UI.
+    El módulo queda cacheado en los globals de este archivo.
+    """
+    module = globals().get(name)
+    if module is not None:
+        return module
+    if getattr(sys, 'frozen', False):
+        # Imports absolutos (PyInstaller)
+        module = importlib.import_module(name)
+    else:
+        try:
+            # Imports relativos (python -m src)
+            module = importlib.import_module(f'.{name}', __package__)
+        except (ImportError, TypeError):
+            # Si falla, intentar imports absolutos
+            module = importlib.import_module(name)
+    globals()[name] = module
+    return module
+
+def __getattr__(name):
+    """PEP 562: media_wheel, i18n, ui_qt y config se importan en el primer acceso"""
+    if name in _LAZY_MODULES:
+        return _load_module(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_tray_libs = None
+
+def _lazy_tray_libs():
+    """Importa pystray y PIL una sola vez; solo los usa la bandeja"""
+    global _tray_libs
+    if _tray_libs is None:
+        import pystray
+        from PIL import Image, ImageDraw
+        _tray_libs = (pystray, Image, ImageDraw)
+    return _tray_libs
 
 # Opcional: bandeja del sistema para salir
 def on_exit(icon, item):
@@ -71,60 +101,69 @@ def on_settings(icon, item):
     global app
     try:
         if app and hasattr(app, 'win') and hasattr(app.win, 'requestSettings'):
+            # El menú se actualiza con la señal settingsSaved (ver run_ui)
             app.win.requestSettings.emit()
-            # Actualizar menú después de cambiar configuración
-            import time
-            time.sleep(0.5)  # Esperar a que se guarde la config
-            update_tray_menu()
     except Exception:
         pass
 
+@functools.lru_cache(maxsize=None)
+def _tray_image():
+    """Icono de la bandeja (se lee de disco una sola vez)"""
+    _, Image, ImageDraw = _lazy_tray_libs()
+    # Usar icono real del proyecto
+    try:
+        icon_path = Path(__file__).parent / 'assets' / 'icon.png'
+        if icon_path.exists():
+            img = Image.open(icon_path)
+            img.load()  # decodificar ya y soltar el fichero
+            return img
+    except Exception:
+        pass
+    # Fallback simple
+    img = Image.new('RGBA', (16, 16), (0, 0, 0, 0))
+    d = ImageDraw.Draw(img)
+    d.rectangle([2, 2, 14, 14], fill=(255, 255, 255, 255))
+    return img
+
+# Entradas del menú: (clave de traducción, acción)
+_TRAY_ITEMS = (
+    ('tray_show', on_show),
+    ('tray_hide', on_hide),
+    ('tray_settings', on_settings),
+    ('tray_exit', on_exit),
+)
+
+def _tray_menu(i18n_inst):
+    """Construye el menú de la bandeja en el idioma de i18n_inst"""
+    pystray = _lazy_tray_libs()[0]
+    return pystray.Menu(*(pystray.MenuItem(i18n_inst.t(key), action) for key, action in _TRAY_ITEMS))
+
 def _start_tray():
     global tray_icon
     try:
-        import pystray
-        from PIL import Image, ImageDraw
-
-        def create_image():
-            # Usar icono real del proyecto
-            try:
-                icon_path = Path(__file__).parent / 'assets' / 'icon.png'
-                if icon_path.exists():
-                    return Image.open(icon_path)
-            except Exception:
-                pass
-            # Fallback simple
-            img = Image.new('RGBA', (16, 16), (0, 0, 0, 0))
-            d = ImageDraw.Draw(img)
-            d.rectangle([2, 2, 14, 14], fill=(255, 255, 255, 255))
-            return img
+        pystray = _lazy_tray_libs()[0]
 
         # Obtener idioma de configuración para el menú
         try:
-            if getattr(sys, 'frozen', False):
-                import ui_qt
-            else:
-                try:
-                    from . import ui_qt
-                except ImportError:
-                    import ui_qt
-            config = ui_qt.load_config()
+            i18n = _load_module('i18n')
+            config = _load_module('config').load_config()
             lang = config.get('language', 'es')
             i18n_inst = i18n.get_i18n(lang)
         except Exception:
-            i18n_inst = i18n.get_i18n('es')
+            i18n_inst = _load_module('i18n').get_i18n('es')
 
+        translations = i18n_inst.translations
         tray_icon = pystray.Icon(
             'SoundBoard',
-            create_image(),
+            _tray_image(),
             'SoundBoard',
-            menu=pystray.Menu(
-                pystray.MenuItem(i18n_inst.t('tray_show'), on_show),
-                pystray.MenuItem(i18n_inst.t('tray_hide'), on_hide),
-                pystray.MenuItem(i18n_inst.t('tray_settings'), on_settings),
-                pystray.MenuItem(i18n_inst.t('tray_exit'), on_exit)
-            )
+            menu=_tray_menu(i18n_inst)
         )
+        # Sin cache el idioma llega después desde GitHub: rehacer el menú
+        # entonces (o ya, si terminó mientras se creaba el icono)
+        i18n_inst.on_update = functools.partial(_rebuild_tray_menu, i18n_inst)
+        if i18n_inst.translations is not translations:
+            _rebuild_tray_menu(i18n_inst)
         tray_icon.run()
     except Exception as e:
         print(f"[TRAY] No se pudo iniciar bandeja: {e}")
@@ -133,56 +172,40 @@ media_hw = None
 app = None
 tray_icon = None
 
+def _rebuild_tray_menu(i18n_inst):
+    """Recrea el menú de la bandeja con las traducciones actuales de i18n_inst"""
+    if tray_icon:
+        try:
+            tray_icon.menu = _tray_menu(i18n_inst)
+            tray_icon.update_menu()
+        except Exception as e:
+            print(f"[TRAY] Error actualizando menú: {e}")
+
 def update_tray_menu():
     """Actualiza el menú de la bandeja con el idioma actual"""
     global tray_icon
     if tray_icon:
         try:
-            if getattr(sys, 'frozen', False):
-                import ui_qt
-            else:
-                try:
-                    from . import ui_qt
-                except ImportError:
-                    import ui_qt
-            config = ui_qt.load_config()
+            i18n = _load_module('i18n')
+            config = _load_module('config').load_config()
             lang = config.get('language', 'es')
             i18n_inst = i18n.get_i18n(lang)
             i18n_inst.set_language(lang)
-            
-            # Recrear el menú con las traducciones actualizadas
-            def on_show_wrapper(icon, item):
-                on_show(icon, item)
-            def on_hide_wrapper(icon, item):
-                on_hide(icon, item)
-            def on_settings_wrapper(icon, item):
-                on_settings(icon, item)
-            def on_exit_wrapper(icon, item):
-                on_exit(icon, item)
-            
-            import pystray
-            tray_icon.menu = pystray.Menu(
-                pystray.MenuItem(i18n_inst.t('tray_show'), on_show_wrapper),
-                pystray.MenuItem(i18n_inst.t('tray_hide'), on_hide_wrapper),
-                pystray.MenuItem(i18n_inst.t('tray_settings'), on_settings_wrapper),
-                pystray.MenuItem(i18n_inst.t('tray_exit'), on_exit_wrapper)
-            )
-            tray_icon.update_menu()
         except Exception as e:
             print(f"[TRAY] Error actualizando menú: {e}")
+            return
+        # Recrear el menú con las traducciones actualizadas (si el idioma aún
+        # se descarga, on_update lo vuelve a rehacer al terminar)
+        _rebuild_tray_menu(i18n_inst)
 
 def run_ui():
     """Inicia la UI Qt (corre en hilo principal)"""
     global app
     try:
-        if getattr(sys, 'frozen', False):
-            import ui_qt
-        else:
-            try:
-                from . import ui_qt
-            except ImportError:
-                import ui_qt
+        ui_qt = _load_module('ui_qt')
         app = ui_qt.SoundBoardUI(None, media_hw)
+        # Refrescar el menú de la bandeja justo cuando se guarda la configuración
+        app.win.settingsSaved.connect(update_tray_menu)
         app.run()
     except Exception as e:
         print(f"[UI] Error: {e}")
@@ -196,11 +219,12 @@ def main():
     print("[SOUNDBOARD] Python versión optimizada (sin Electron)")
     print("[SOUNDBOARD] Interfaz en background - usa la rueda multimedia para mostrar")
 
-    # Cargar configuración para obtener el step
-    config = ui_qt.load_config()
+    # Cargar configuración para obtener el step (sin importar aún PySide6)
+    config = _load_module('config').load_config()
     step = config.get('step', 4)
 
     try:
+        media_wheel = _load_module('media_wheel')
         media_hw = media_wheel.start_media_wheel(step=step, hold_ms=2000)
     except Exception as e:
         print(f"[MEDIA-WHEEL] No se pudo iniciar la rueda multimedia: {e}")
@@ -5,14 +5,29 @@ _compointer_base; se parchea de forma defensiva.
 """
 import os
 import json
-import base64
+import asyncio
+import functools
+import threading
 import time
-import io
-import psutil
-from PIL import Image
-from pathlib import Path
-import base64
-import io
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson (en requirements.txt) serializa directamente a bytes UTF-8 y es
+# bastante más rápido con los iconos base64 del estado; sin él, json
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    _loads = json.loads
+
+# Mensajes por pulsación/evento (SBM_VERBOSE=1): por defecto no se escriben,
+# cada print toma el lock de stdout en el hilo que atiende las teclas
+VERBOSE = os.getenv('SBM_VERBOSE') == '1'
+
+# pycaw/comtypes, psutil, PIL y pywin32 se importan en el primer uso: la
+# bandeja y la rueda multimedia arrancan antes de que el audio esté listo.
 
 
 def _safe_import_comtypes():
@@ -51,33 +66,39 @@ def _safe_import_comtypes():
         return None
 
 
+def _find_in_comtypes(attr, submodules):
+    """Devuelve comtypes.<submódulo>.<attr> del primer submódulo que lo tenga.
+
+    Consulta sys.modules antes de importar y usa getattr con valor por
+    defecto: sin cadenas de try/except por cada candidato.
+    """
+    import importlib
+    import sys
+
+    for sub in submodules:
+        name = f"comtypes.{sub}"
+        mod = sys.modules.get(name)
+        if mod is None:
+            try:
+                mod = importlib.import_module(name)
+            except Exception:
+                continue
+        value = getattr(mod, attr, None)
+        if value is not None:
+            return value
+    return None
+
+
 def _ensure_commethod():
     """Garantiza que comtypes exponga COMMETHOD (faltante en algunos builds)."""
     try:
         import comtypes
         if hasattr(comtypes, "COMMETHOD"):
             return
-        try:
-            from comtypes import _meta
-            if hasattr(_meta, "COMMETHOD"):
-                comtypes.COMMETHOD = _meta.COMMETHOD  # type: ignore[attr-defined]
-                return
-        except Exception:
-            pass
-        try:
-            from comtypes import _cominterface
-            if hasattr(_cominterface, "COMMETHOD"):
-                comtypes.COMMETHOD = _cominterface.COMMETHOD  # type: ignore[attr-defined]
-                return
-        except Exception:
-            pass
-        try:
-            from comtypes import _methods
-            if hasattr(_methods, "COMMETHOD"):
-                comtypes.COMMETHOD = _methods.COMMETHOD  # type: ignore[attr-defined]
-                return
-        except Exception:
-            pass
+        found = _find_in_comtypes("COMMETHOD", ("_meta", "_cominterface", "_methods"))
+        if found is not None:
+            comtypes.COMMETHOD = found  # type: ignore[attr-defined]
+            return
         # Fallback: definir stub mínimo para permitir import de pycaw
         def _commethod_stub(*args, **kwargs):  # type: ignore[unused-argument]
             return (args, kwargs)
@@ -93,20 +114,10 @@ def _ensure_iunknown():
         import comtypes
         if hasattr(comtypes, "IUnknown"):
             return
-        try:
-            from comtypes import _cominterface
-            if hasattr(_cominterface, "IUnknown"):
-                comtypes.IUnknown = _cominterface.IUnknown  # type: ignore[attr-defined]
-                return
-        except Exception:
-            pass
-        try:
-            from comtypes import _comobject
-            if hasattr(_comobject, "IUnknown"):
-                comtypes.IUnknown = _comobject.IUnknown  # type: ignore[attr-defined]
-                return
-        except Exception:
-            pass
+        found = _find_in_comtypes("IUnknown", ("_cominterface", "_comobject"))
+        if found is not None:
+            comtypes.IUnknown = found  # type: ignore[attr-defined]
+            return
         # Fallback mínimo para evitar ImportError; puede limitar funcionalidad COM
         import ctypes
         class _IUnknownStub(ctypes.Structure):  # pragma: no cover - stub de emergencia
@@ -119,13 +130,6 @@ def _ensure_iunknown():
         print(f"[COMTYPES] Error asegurando IUnknown: {e}")
 
 
-try:
-    import comtypes  # noqa: F401
-except Exception as e:
-    print(f"[COMTYPES] Import error, applying patch: {e}")
-    _safe_import_comtypes()
-_ensure_commethod()
-_ensure_iunknown()
 def _ensure_stdmethod():
     """Garantiza que comtypes exponga STDMETHOD (alias habitual de COMMETHOD)."""
     try:
@@ -137,46 +141,31 @@ def _ensure_stdmethod():
             comtypes.STDMETHOD = comtypes.COMMETHOD  # type: ignore[assignment]
             return
         # Intentar cargar desde módulos internos
-        for mod_name in ("_meta", "_methods", "_cominterface"):
-            try:
-                mod = __import__(f"comtypes.{mod_name}", fromlist=["*"])
-                if hasattr(mod, "STDMETHOD"):
-                    comtypes.STDMETHOD = getattr(mod, "STDMETHOD")  # type: ignore[assignment]
-                    return
-                if hasattr(mod, "COMMETHOD"):
-                    comtypes.STDMETHOD = getattr(mod, "COMMETHOD")  # type: ignore[assignment]
-                    return
-            except Exception:
-                pass
-        # Fallback: alias a COMMETHOD de módulo base si se definió stub antes
-        if hasattr(comtypes, "COMMETHOD"):
-            comtypes.STDMETHOD = comtypes.COMMETHOD  # type: ignore[assignment]
+        internals = ("_meta", "_methods", "_cominterface")
+        found = _find_in_comtypes("STDMETHOD", internals) or _find_in_comtypes("COMMETHOD", internals)
+        if found is not None:
+            comtypes.STDMETHOD = found  # type: ignore[assignment]
             return
         print("[COMTYPES] STDMETHOD no disponible tras intentos de parcheo")
     except Exception as e:
         print(f"[COMTYPES] Error asegurando STDMETHOD: {e}")
 
-_ensure_stdmethod()
 def _ensure_bstr():
     """Garantiza que comtypes exponga BSTR (usado en automation)."""
     try:
         import comtypes
         if hasattr(comtypes, "BSTR"):
             return
-        try:
-            import comtypes.automation as _auto
-            if hasattr(_auto, "BSTR"):
-                comtypes.BSTR = _auto.BSTR  # type: ignore[assignment]
-                return
-        except Exception:
-            pass
+        found = _find_in_comtypes("BSTR", ("automation",))
+        if found is not None:
+            comtypes.BSTR = found  # type: ignore[assignment]
+            return
         import ctypes
         comtypes.BSTR = ctypes.c_wchar_p  # type: ignore[assignment]
         print("[COMTYPES] BSTR no encontrado; se asignó ctypes.c_wchar_p como fallback")
     except Exception as e:
         print(f"[COMTYPES] Error asegurando BSTR: {e}")
 
-_ensure_bstr()
 def _ensure_cocreateinstance():
     """Garantiza que comtypes exponga CoCreateInstance (usado por pycaw)."""
     try:
@@ -237,46 +226,360 @@ def _ensure_cocreateinstance():
     except Exception as e:
         print(f"[COMTYPES] Error asegurando CoCreateInstance: {e}")
 
-_ensure_cocreateinstance()
-from pycaw.pycaw import AudioUtilities
+def _patch_comtypes():
+    """Aplica todos los parches de comtypes; debe ejecutarse antes de importar pycaw."""
+    try:
+        import comtypes  # noqa: F401
+    except Exception as e:
+        print(f"[COMTYPES] Import error, applying patch: {e}")
+        _safe_import_comtypes()
+    _ensure_commethod()
+    _ensure_iunknown()
+    _ensure_stdmethod()
+    _ensure_bstr()
+    _ensure_cocreateinstance()
+
+
+_AudioUtilities = None
+_import_lock = threading.Lock()
+
+def _audio_utilities():
+    """Devuelve pycaw.AudioUtilities, importándolo (con comtypes parcheado) en el primer uso."""
+    global _AudioUtilities
+    if _AudioUtilities is None:
+        with _import_lock:
+            if _AudioUtilities is None:
+                _patch_comtypes()
+                from pycaw.pycaw import AudioUtilities
+                _AudioUtilities = AudioUtilities
+    return _AudioUtilities
+
+
+# win32api/win32gui/win32ui y PIL.Image: se importan en el primer uso y
+# quedan en estos slots; las rutas de iconos y nombres leen un global en
+# vez de pasar por la maquinaria de import en cada llamada
+_win32api = None
+_win32gui = None
+_win32ui = None
+_pil_image = None
+
+def _get_win32api():
+    global _win32api
+    if _win32api is None:
+        import win32api
+        _win32api = win32api
+    return _win32api
+
+def _get_win32gui():
+    global _win32gui
+    if _win32gui is None:
+        import win32gui
+        _win32gui = win32gui
+    return _win32gui
+
+def _get_win32ui():
+    global _win32ui
+    if _win32ui is None:
+        import win32ui
+        _win32ui = win32ui
+    return _win32ui
+
+def _get_pil_image():
+    global _pil_image
+    if _pil_image is None:
+        from PIL import Image
+        _pil_image = Image
+    return _pil_image
+
+
+def __getattr__(name):
+    """PEP 562: backend.AudioUtilities sigue disponible sin cargar pycaw al importar."""
+    if name == 'AudioUtilities':
+        return _audio_utilities()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Variables globales
 last_master_volume = None
 config_file = None
 config_data = {}
-config_mtime = None
+config_mtime = None  # st_mtime_ns de la última carga
+# Aviso de cambios de settings.json vía watchdog (si está instalado);
+# sin observador se vuelve a comparar el mtime en cada refresco
+_config_dirty = False
+_config_observer = None
+
+# IAudioEndpointVolume cacheado por hilo: los punteros COM no se comparten
+# entre apartamentos (hook de teclado, UI, refresco de sesiones)
+_endpoint_local = threading.local()
+# Se incrementa cuando Windows cambia el dispositivo de salida por defecto;
+# un endpoint activado con otra generación apunta al dispositivo anterior
+_endpoint_generation = 0
+# (enumerador, cliente) registrados para recibir OnDefaultDeviceChanged;
+# False si pycaw no ofrece callbacks y se usa ENDPOINT_TTL
+_device_notifier = None
+_device_notifier_lock = threading.Lock()
+ENDPOINT_TTL = 5.0  # segundos, solo sin notificaciones
+
+def _watch_default_device():
+    """Registra (una vez) un IMMNotificationClient para invalidar el endpoint."""
+    global _device_notifier
+    if _device_notifier is not None:
+        return bool(_device_notifier)
+    with _device_notifier_lock:
+        if _device_notifier is None:
+            _device_notifier = _register_device_notifier()
+    return bool(_device_notifier)
+
+def _register_device_notifier():
+    try:
+        from pycaw.callbacks import MMNotificationClient
+    except ImportError:
+        return False
+
+    class _DefaultDeviceClient(MMNotificationClient):
+        def on_default_device_changed(self, *args):
+            global _endpoint_generation
+            _endpoint_generation += 1
+
+    try:
+        enumerator = _audio_utilities().GetDeviceEnumerator()
+        client = _DefaultDeviceClient()
+        enumerator.RegisterEndpointNotificationCallback(client)
+        return (enumerator, client)
+    except Exception as e:
+        print(f"[AUDIO] Sin aviso de cambio de dispositivo, se reactivará cada {ENDPOINT_TTL:g}s: {e}")
+        return False
+
+def _speakers():
+    """AudioDevice de salida por defecto, creado una vez por hilo.
+
+    GetSpeakers() lee todo el property store del dispositivo; el AudioDevice
+    además guarda el IAudioEndpointVolume y el IAudioSessionManager2 ya
+    activados. Se recrea si cambió el dispositivo por defecto (o, sin
+    notificaciones, pasado ENDPOINT_TTL).
+    """
+    speakers = getattr(_endpoint_local, 'speakers', None)
+    if speakers is not None:
+        if _watch_default_device():
+            if _endpoint_local.generation == _endpoint_generation:
+                return speakers
+        elif time.monotonic() - _endpoint_local.activated_at < ENDPOINT_TTL:
+            return speakers
+    generation = _endpoint_generation
+    speakers = _audio_utilities().GetSpeakers()
+    if speakers is None:
+        raise RuntimeError("No hay dispositivo de salida por defecto")
+    _endpoint_local.speakers = speakers
+    _endpoint_local.generation = generation
+    _endpoint_local.activated_at = time.monotonic()
+    return speakers
+
+def _get_endpoint():
+    """Devuelve el IAudioEndpointVolume de los altavoces (cacheado por hilo)."""
+    return _speakers().EndpointVolume
+
+def _with_endpoint(fn):
+    """Ejecuta fn(endpoint); si falla (p. ej. cambió el dispositivo) reactiva y reintenta una vez."""
+    try:
+        return fn(_get_endpoint())
+    except Exception:
+        _endpoint_local.speakers = None
+        return fn(_get_endpoint())
+
+# ¿Expone la interfaz COM este método? Se mira una vez por clase: hasattr()
+# sobre un proxy de comtypes que no lo tiene pasa por su __getattr__ y
+# lanza/traga AttributeError en cada refresco
+_COM_METHODS = {}
+
+def _has_com_method(ctrl, name):
+    key = (type(ctrl), name)
+    has = _COM_METHODS.get(key)
+    if has is None:
+        has = _COM_METHODS[key] = getattr(key[0], name, None) is not None
+    return has
+
+# Sesiones de pycaw cacheadas por hilo (mismo motivo que el endpoint):
+# [instante, sesiones, {pid: SimpleAudioVolume} o None hasta que se pida]
+_sessions_local = threading.local()
+SESSION_CACHE_TTL = 0.5  # segundos
+
+def _enumerate_sessions():
+    """Equivalente a AudioUtilities.GetAllSessions() con menos COM por refresco.
+
+    Reutiliza el IAudioSessionManager2 del dispositivo cacheado y, para cada
+    sesión que ya se vio (mismo identificador de instancia), su AudioSession
+    anterior: conserva el psutil.Process y el ISimpleAudioVolume ya resueltos.
+    El enumerador sí se pide cada vez: es una foto fija de las sesiones.
+    """
+    from pycaw.pycaw import AudioSession, IAudioSessionControl2
+
+    enumerator = _speakers().AudioSessionManager.GetSessionEnumerator()
+    known = getattr(_sessions_local, 'wrappers', {})
+    wrappers = {}
+    sessions = []
+    for i in range(enumerator.GetCount()):
+        ctl = enumerator.GetSession(i)
+        if ctl is None:
+            continue
+        ctl2 = ctl.QueryInterface(IAudioSessionControl2)
+        if ctl2 is None:
+            continue
+        try:
+            instance_id = ctl2.GetSessionInstanceIdentifier()
+        except Exception:
+            instance_id = None
+        session = known.get(instance_id) if instance_id else None
+        if session is None:
+            session = AudioSession(ctl2)
+        if instance_id:
+            wrappers[instance_id] = session
+        sessions.append(session)
+    for instance_id, session in known.items():
+        # Sesión cerrada: soltar su IAudioSessionEvents si se registró uno
+        if instance_id not in wrappers and session._callback is not None:
+            try:
+                session.unregister_notification()
+            except Exception:
+                pass
+    _sessions_local.wrappers = wrappers
+    return sessions
+
+def _refresh_sessions():
+    """Enumera las sesiones y renueva la caché del hilo."""
+    try:
+        sessions = _enumerate_sessions()
+    except Exception:
+        # Dispositivo cambiado o interfaz caducada: empezar de cero una vez
+        _endpoint_local.speakers = None
+        _sessions_local.wrappers = {}
+        sessions = _enumerate_sessions()
+    _sessions_local.cache = [time.monotonic(), sessions, None]
+    return sessions
+
+def _get_sessions(ttl=SESSION_CACHE_TTL):
+    """Sesiones de audio; solo se vuelve a enumerar (COM) si la caché caducó."""
+    cache = getattr(_sessions_local, 'cache', None)
+    if cache is None or time.monotonic() - cache[0] >= ttl:
+        return _refresh_sessions()
+    return cache[1]
+
+def _remember_controls(sessions, by_pid):
+    """Guarda el índice pid -> control que el llamador ya construyó al recorrer
+    las sesiones, para que _session_control no tenga que volver a hacerlo."""
+    cache = getattr(_sessions_local, 'cache', None)
+    if cache is not None and cache[1] is sessions and cache[2] is None:
+        cache[2] = by_pid
+
+def _session_control(pid):
+    """SimpleAudioVolume de la sesión de un PID (búsqueda O(1) en la caché).
+
+    Si el PID no está (sesión nueva) se enumera de nuevo una sola vez.
+    """
+    for attempt in range(2):
+        if attempt:
+            _refresh_sessions()
+        sessions = _get_sessions()
+        cache = _sessions_local.cache
+        if cache[2] is None:
+            by_pid = {}
+            for session in sessions:
+                try:
+                    process = session.Process
+                    if process and process.pid not in by_pid:
+                        ctrl = session.SimpleAudioVolume
+                        if ctrl:
+                            by_pid[process.pid] = ctrl
+                except Exception:
+                    pass
+            cache[2] = by_pid
+        ctrl = cache[2].get(pid)
+        if ctrl is not None:
+            return ctrl
+    return None
 
 def get_master_volume():
     """Obtiene volumen maestro actual"""
     try:
-        from pycaw.pycaw import IAudioMeterInformation
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(
-            AudioUtilities.IID_IAudioEndpointVolume, 0, None)
-        volume = interface.GetMasterVolumeLevelScalar()
-        return volume
+        return _with_endpoint(lambda ep: ep.GetMasterVolumeLevelScalar())
     except:
         return None
 
+# Volumen maestro según el último aviso de IAudioEndpointVolumeCallback: el
+# hook lo compara en cada tecla sin llamar a COM
+_master_cache = None
+# (endpoint, callback, generación) registrados; False si no hay avisos
+_master_watch = None
+_master_watch_lock = threading.Lock()
+
+def _watch_master_volume():
+    """Registra (y re-registra al cambiar de dispositivo) el aviso de volumen maestro."""
+    global _master_watch, _master_cache
+    watch = _master_watch
+    if watch is False:
+        return False
+    if watch is not None and watch[2] == _endpoint_generation:
+        return True
+    # Sin aviso de cambio de dispositivo no se sabría cuándo re-registrar
+    if not _watch_default_device():
+        _master_watch = False
+        return False
+    try:
+        from pycaw.callbacks import AudioEndpointVolumeCallback
+    except ImportError:
+        _master_watch = False
+        return False
+
+    class _MasterVolumeCallback(AudioEndpointVolumeCallback):
+        def on_notify(self, new_volume, *args):
+            global _master_cache
+            _master_cache = new_volume
+
+    with _master_watch_lock:
+        watch = _master_watch
+        if watch is not None and watch is not False and watch[2] == _endpoint_generation:
+            return True
+        try:
+            if watch:
+                try:
+                    watch[0].UnregisterControlChangeNotify(watch[1])
+                except Exception:
+                    pass
+            generation = _endpoint_generation
+            endpoint = _get_endpoint()
+            callback = _MasterVolumeCallback()
+            endpoint.RegisterControlChangeNotify(callback)
+            _master_cache = endpoint.GetMasterVolumeLevelScalar()
+        except Exception as e:
+            print(f"[AUDIO] Sin aviso de volumen maestro, se consultará en cada tecla: {e}")
+            _master_watch = False
+            return False
+        _master_watch = (endpoint, callback, generation)
+    return True
+
+def get_master_volume_cached():
+    """Volumen maestro desde memoria si hay avisos; si no, get_master_volume()"""
+    if _watch_master_volume():
+        level = _master_cache
+        if level is not None:
+            return level
+    return get_master_volume()
+
 def set_master_volume(level):
     """Establece volumen maestro"""
     try:
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(
-            AudioUtilities.IID_IAudioEndpointVolume, 0, None)
-        interface.SetMasterVolumeLevelScalar(level, None)
+        _with_endpoint(lambda ep: ep.SetMasterVolumeLevelScalar(level, None))
     except:
         pass
 
 
 def toggle_master_mute():
     """Alterna el mute del volumen maestro."""
-    try:
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(
-            AudioUtilities.IID_IAudioEndpointVolume, 0, None)
-        current = bool(interface.GetMute()) if hasattr(interface, 'GetMute') else False
+    def _toggle(interface):
+        current = bool(interface.GetMute()) if _has_com_method(interface, 'GetMute') else False
         interface.SetMute(not current, None)
+
+    try:
+        _with_endpoint(_toggle)
         return True
     except Exception as e:
         print(f"[AUDIO] Error toggle_master_mute: {e}")
@@ -286,75 +589,201 @@ def load_config():
     """Carga configuración desde settings.json"""
     global config_file, config_data, config_mtime
     try:
-        appdata = os.getenv('APPDATA')
-        config_dir = os.path.join(appdata, 'volume-mixer')
-        config_file = os.path.join(config_dir, 'settings.json')
+        # La ruta se calcula una sola vez
+        if config_file is None:
+            appdata = os.getenv('APPDATA')
+            config_file = os.path.join(appdata, 'volume-mixer', 'settings.json')
+        _watch_config(os.path.dirname(config_file))
         
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                config_data = json.load(f)
-            try:
-                config_mtime = os.path.getmtime(config_file)
-            except:
-                config_mtime = None
-                print(f"[CONFIG] Configuración cargada")
-                return config_data
+        # Un único stat: existencia y mtime a la vez
+        try:
+            st = os.stat(config_file)
+        except FileNotFoundError:
+            return {}
+        with open(config_file, 'rb') as f:
+            config_data = _loads(f.read())
+        config_mtime = st.st_mtime_ns
+        print("[CONFIG] Configuración cargada")
+        return config_data
     except Exception as e:
         print(f"[CONFIG] Error cargando config: {e}")
     
     return {}
 
+def _watch_config(config_dir):
+    """Arranca (una vez) un observador watchdog sobre la carpeta de configuración.
+
+    Devuelve False si la carpeta aún no existe (o falta watchdog, que está en
+    requirements.txt); en ese caso refresh_config_if_changed() sigue
+    comparando el mtime.
+    """
+    global _config_observer
+    if _config_observer is not None:
+        return True
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        return False
+
+    class _ConfigHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            global _config_dirty
+            for path in (event.src_path, getattr(event, 'dest_path', None)):
+                if path and os.path.basename(path) == 'settings.json':
+                    _config_dirty = True
+
+    try:
+        observer = Observer()
+        observer.daemon = True
+        observer.schedule(_ConfigHandler(), config_dir, recursive=False)
+        observer.start()
+    except Exception as e:
+        print(f"[CONFIG] No se pudo observar {config_dir}: {e}")
+        return False
+    _config_observer = observer
+    return True
+
 def refresh_config_if_changed():
     """Recarga configuración solo si el archivo cambió"""
-    global config_mtime
+    global config_mtime, _config_dirty
+    if _config_observer is not None:
+        # Con watchdog el hot path es solo comprobar un flag, sin stat()
+        if _config_dirty:
+            _config_dirty = False
+            load_config()
+        return
+    if not config_file:
+        return
     try:
-        if config_file and os.path.exists(config_file):
-            current_mtime = os.path.getmtime(config_file)
-            if config_mtime is None or current_mtime != config_mtime:
-                load_config()
+        try:
+            st = os.stat(config_file)
+        except FileNotFoundError:
+            return
+        # Comparación entera en ns: un stat por sondeo y sin igualdad de floats
+        if config_mtime is None or st.st_mtime_ns != config_mtime:
+            load_config()
     except Exception as e:
         print(f"[CONFIG] Error refrescando config: {e}")
 
-def get_app_name_clean(pid):
-    """Obtiene el nombre limpio de la aplicación"""
+FRIENDLY_NAMES = {
+    'msedge.exe': 'Microsoft Edge',
+    'chrome.exe': 'Google Chrome',
+    'steam.exe': 'Steam',
+    'telegram.exe': 'Telegram Desktop',
+    'whatsapp.exe': 'WhatsApp',
+    'spotify.exe': 'Spotify',
+    'vlc.exe': 'VLC media player',
+}
+
+# (pid, create_time) -> ruta del exe. pycaw crea un psutil.Process por cada
+# AudioSession nueva (y un proceso puede abrir y cerrar muchas), así que la
+# caché interna de psutil no basta; create_time (ya leído por psutil al construir el Process)
+# distingue un PID reutilizado por otro proceso.
+_exe_by_process = {}
+_EXE_CACHE_MAX = 512
+
+def _process_exe(process):
+    """Ruta del ejecutable de un psutil.Process, sin repetir la consulta Win32."""
     try:
-        process = psutil.Process(pid)
-        exe_path = process.exe()
-        base_name = os.path.basename(exe_path).lower()
-        FRIENDLY = {
-            'msedge.exe': 'Microsoft Edge',
-            'chrome.exe': 'Google Chrome',
-            'steam.exe': 'Steam',
-            'telegram.exe': 'Telegram Desktop',
-            'whatsapp.exe': 'WhatsApp',
-            'spotify.exe': 'Spotify',
-            'vlc.exe': 'VLC media player',
-        }
-        
-        # Intentar obtener el nombre del producto desde el ejecutable
-        import win32api
+        key = (process.pid, process.create_time())
+    except Exception:
+        return None
+    exe_path = _exe_by_process.get(key)
+    if exe_path is None:
         try:
-            info = win32api.GetFileVersionInfo(exe_path, '\\')
-            lang, codepage = win32api.GetFileVersionInfo(exe_path, '\\VarFileInfo\\Translation')[0]
-            string_file_info = f'\\StringFileInfo\\{lang:04X}{codepage:04X}\\'
-            
-            # Intentar obtener ProductName, si no FileDescription, si no el nombre del proceso
-            for key in ['ProductName', 'FileDescription']:
-                try:
-                    name = win32api.GetFileVersionInfo(exe_path, string_file_info + key)
-                    if name:
-                        return name
-                except:
-                    pass
-        except:
-            pass
+            exe_path = process.exe()
+        except Exception:
+            return None
+        if len(_exe_by_process) >= _EXE_CACHE_MAX:
+            _exe_by_process.clear()
+        _exe_by_process[key] = exe_path
+    return exe_path
+
+def _get_exe(pid):
+    """Ruta del ejecutable de un PID, o None"""
+    import psutil
+    try:
+        return _process_exe(psutil.Process(pid))
+    except Exception:
+        return None
+
+@functools.lru_cache(maxsize=256)
+def _name_from_exe(exe_path):
+    """Nombre limpio de la aplicación a partir de su ejecutable.
+
+    El resultado depende solo de la ruta (no del PID), así que se cachea:
+    reiniciar la app no obliga a volver a leer su VERSIONINFO.
+    """
+    if not exe_path:
+        return "Unknown"
+    file_name = os.path.basename(exe_path)
+    
+    # Nombres conocidos: no hace falta abrir los recursos del PE
+    friendly = FRIENDLY_NAMES.get(file_name.casefold())
+    if friendly:
+        return friendly
+    
+    # Intentar obtener el nombre del producto desde el ejecutable
+    try:
+        win32api = _get_win32api()
+        lang, codepage = win32api.GetFileVersionInfo(exe_path, '\\VarFileInfo\\Translation')[0]
+        string_file_info = f'\\StringFileInfo\\{lang:04X}{codepage:04X}\\'
         
-        # Fallback: nombre del proceso sin .exe
-        if base_name in FRIENDLY:
-            return FRIENDLY[base_name]
-        return process.name().replace('.exe', '')
+        # Intentar obtener ProductName, si no FileDescription, si no el nombre del proceso
+        for key in ['ProductName', 'FileDescription']:
+            try:
+                name = win32api.GetFileVersionInfo(exe_path, string_file_info + key)
+                if name:
+                    return name
+            except:
+                pass
     except:
-        return "Unknown"
+        pass
+    
+    # Fallback: nombre del ejecutable sin .exe
+    return file_name.replace('.exe', '')
+
+def get_app_name_clean(pid):
+    """Obtiene el nombre limpio de la aplicación"""
+    return _name_from_exe(_get_exe(pid))
+
+# Índice de accesos directos del Start Menu: {nombre en minúsculas: ruta .lnk}.
+# Se reconstruye si cambia el mtime de la carpeta raíz o tras LNK_INDEX_TTL
+# (el mtime de la raíz no refleja cambios en subcarpetas).
+_lnk_index = None
+_lnk_index_mtime = None
+_lnk_index_ts = 0.0
+LNK_INDEX_TTL = 300  # segundos
+
+def _scan_lnk_files(root):
+    """Recorre root con os.scandir (sin recursión ni objetos Path por entrada)"""
+    index = {}
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.lower().endswith('.lnk'):
+                        index.setdefault(entry.name[:-4].lower(), entry.path)
+        except OSError:
+            pass
+    return index
+
+def _get_lnk_index(start_menu):
+    global _lnk_index, _lnk_index_mtime, _lnk_index_ts
+    try:
+        mtime = os.path.getmtime(start_menu)
+    except OSError:
+        return {}
+    now = time.monotonic()
+    if _lnk_index is None or mtime != _lnk_index_mtime or now - _lnk_index_ts >= LNK_INDEX_TTL:
+        _lnk_index = _scan_lnk_files(start_menu)
+        _lnk_index_mtime = mtime
+        _lnk_index_ts = now
+    return _lnk_index
 
 def get_icon_from_shortcut(app_name):
     """Busca un acceso directo .lnk en Start Menu y extrae su icono.
@@ -364,35 +793,30 @@ def get_icon_from_shortcut(app_name):
     - Búsqueda recursiva por nombre similar
     """
     try:
-        import win32com.client
-        shell = win32com.client.Dispatch("WScript.Shell")
-        
         # Rutas posibles de Start Menu
         appdata = os.getenv('APPDATA', '')
         start_menu = os.path.join(appdata, 'Microsoft', 'Windows', 'Start Menu', 'Programs')
         
-        if not os.path.exists(start_menu):
-            return None
-        
-        # Buscar .lnk files recursivamente
-        lnk_files = list(Path(start_menu).rglob('*.lnk'))
+        # Índice de .lnk cacheado (recorrido recursivo solo si cambió)
+        lnk_index = _get_lnk_index(start_menu)
         
         # Prioridad: búsqueda exacta por nombre, luego búsqueda parcial
-        candidates = []
-        for lnk_path in lnk_files:
-            lnk_name = lnk_path.stem.lower()
-            app_lower = app_name.lower()
-            if lnk_name == app_lower or app_lower in lnk_name or lnk_name in app_lower:
-                candidates.append(lnk_path)
-        
-        if not candidates:
+        app_lower = app_name.lower()
+        lnk_file = lnk_index.get(app_lower)
+        if lnk_file is None:
+            for lnk_name, lnk_path in lnk_index.items():
+                if app_lower in lnk_name or lnk_name in app_lower:
+                    lnk_file = lnk_path
+                    break
+        
+        if lnk_file is None:
             return None
         
-        # Usar el primer coincidente
-        lnk_file = candidates[0]
+        import win32com.client
+        shell = win32com.client.Dispatch("WScript.Shell")
         
         try:
-            shortcut = shell.CreateShortcut(str(lnk_file))
+            shortcut = shell.CreateShortcut(lnk_file)
             icon_path = shortcut.IconLocation  # Formato: "path,index" o ",index"
             target_path = shortcut.TargetPath
             
@@ -432,6 +856,57 @@ def get_icon_from_shortcut(app_name):
         return None
 
 
+def _mask_bits(hbm_mask):
+    """Bytes crudos de la máscara AND (1 bpp) de un icono"""
+    return _get_win32ui().CreateBitmapFromHandle(hbm_mask).GetBitmapBits(True)
+
+
+def _alpha_from_mask(bits, width, height):
+    """Convierte la máscara AND (1 bpp) de un icono en canal alfa.
+
+    Se decodifica de una vez con PIL en vez de recorrer píxel a píxel:
+    bit 1 = fondo (transparente), bit 0 = icono (opaco).
+    """
+    Image = _get_pil_image()
+    stride = ((width + 15) // 16) * 2  # GetBitmapBits alinea cada fila a WORD
+    mask = Image.frombuffer('1', (width, height), bits, 'raw', '1;I', stride, 1)
+    return mask.convert('L')
+
+
+ICON_SIZE = (24, 24)
+
+def _to_icon_size(img):
+    """Reduce la imagen a ICON_SIZE.
+
+    Filtro BOX (promedio, como HALFTONE de GDI) con reducing_gap: los iconos
+    grandes se reducen primero por un factor entero en C. A 24 px LANCZOS
+    no se distingue y cuesta varias veces más.
+    """
+    if img.size == ICON_SIZE:
+        return img
+    return img.resize(ICON_SIZE, _get_pil_image().BOX, reducing_gap=2.0)
+
+
+# huella del bitmap -> data URI. Los procesos hijos de apps Electron
+# (Slack, VS Code, Discord...) tienen exe distintos con el mismo icono:
+# así comparten una sola cadena base64 y se codifica el PNG una vez.
+_png_by_bmp = {}
+
+
+def _png_data_uri(img):
+    """Codifica la imagen como data URI PNG.
+
+    compress_level=1: para iconos de 24x24 el PNG apenas crece y zlib
+    tarda varias veces menos que con el nivel por defecto (6).
+    """
+    import binascii
+    import io
+
+    buf = io.BytesIO()
+    img.save(buf, format='PNG', optimize=False, compress_level=1)
+    return 'data:image/png;base64,' + binascii.b2a_base64(buf.getbuffer(), newline=False).decode('ascii')
+
+
 def extract_icon_from_file(file_path, index=0):
     """Extrae icono de un archivo (.exe, .dll, .ico) y lo convierte a PNG base64.
     
@@ -439,10 +914,13 @@ def extract_icon_from_file(file_path, index=0):
     1. win32gui.ExtractIconEx
     2. Buscar PNG embebido en el archivo
     """
+    import io
+    import hashlib
+    Image = _get_pil_image()
+
     try:
-        import win32gui
-        import win32ui
-        import win32con
+        win32gui = _get_win32gui()
+        win32ui = _get_win32ui()
         
         large, small = win32gui.ExtractIconEx(file_path, index)
         hicon = None
@@ -454,43 +932,54 @@ def extract_icon_from_file(file_path, index=0):
         if not hicon:
             return None
         
+        # (fIcon, xHotspot, yHotspot, hbmMask, hbmColor)
         iconinfo = win32gui.GetIconInfo(hicon)
-        hbm_color = iconinfo['hbmColor']
-        hbm_mask = iconinfo['hbmMask']
+        hbm_mask, hbm_color = iconinfo[3], iconinfo[4]
         
-        hdc = win32gui.GetDC(0)
-        srcdc = win32ui.CreateDCFromHandle(hdc)
-        memdc = srcdc.CreateCompatibleDC()
+        # Los bits se leen directamente del bitmap: no hace falta ningún DC
         bmp = win32ui.CreateBitmapFromHandle(hbm_color)
-        memdc.SelectObject(bmp)
         
         bmpinfo = bmp.GetInfo()
         width, height = bmpinfo['bmWidth'], bmpinfo['bmHeight']
         raw_bits = bmp.GetBitmapBits(True)
         
         img = Image.frombuffer('RGBA', (width, height), raw_bits, 'raw', 'BGRA', 0, 1)
-        img = img.resize((24, 24), Image.LANCZOS)
+        # Alfa sin información (iconos de 24 bpp o menos): el fondo está
+        # en la máscara AND. Los iconos de 32 bpp conservan su alfa real.
+        mask_bits = None
+        if img.getchannel('A').getextrema() in ((0, 0), (255, 255)):
+            mask_bits = _mask_bits(hbm_mask)
         
-        buf = io.BytesIO()
-        img.save(buf, format='PNG')
-        b64 = base64.b64encode(buf.getvalue()).decode('ascii')
+        digest = hashlib.blake2b(raw_bits, digest_size=16)
+        if mask_bits is not None:
+            digest.update(mask_bits)
+        key = (width, height, digest.digest())
+        data_uri = _png_by_bmp.get(key)
+        if data_uri is None:
+            if mask_bits is not None:
+                img.putalpha(_alpha_from_mask(mask_bits, width, height))
+            img = _to_icon_size(img)
+            data_uri = _png_by_bmp[key] = _png_data_uri(img)
         
         try:
+            destroy_icon = win32gui.DestroyIcon
             for ico in large:
-                win32gui.DestroyIcon(ico)
+                destroy_icon(ico)
             for ico in small:
-                win32gui.DestroyIcon(ico)
+                destroy_icon(ico)
         except Exception:
             pass
         
-        return 'data:image/png;base64,' + b64
+        return data_uri
     except Exception:
         pass
     
     # Fallback: buscar PNG embebido en el archivo
     try:
-        with open(file_path, 'rb') as f:
-            data = f.read()
+        import mmap
+        # mmap en vez de f.read(): un exe de Electron pesa 100+ MB y solo se
+        # leen (paginan) los bytes hasta el primer PNG
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
             png_header = b'\x89PNG\r\n\x1a\n'
             idx = data.find(png_header)
             
@@ -500,26 +989,61 @@ def extract_icon_from_file(file_path, index=0):
                 if iend <= idx:
                     return None
                 
-                # Extraer PNG
+                # Extraer PNG (copia solo esos bytes)
                 png_data = data[idx:iend]
                 
                 # Cargar con PIL
                 img = Image.open(io.BytesIO(png_data))
                 
                 # Resize a 24x24
-                img_resized = img.resize((24, 24), Image.LANCZOS)
+                img_resized = _to_icon_size(img)
                 
                 # Convertir a base64
-                buf = io.BytesIO()
-                img_resized.save(buf, format='PNG')
-                b64 = base64.b64encode(buf.getvalue()).decode('ascii')
-                
-                return 'data:image/png;base64,' + b64
+                return _png_data_uri(img_resized)
     except Exception:
         pass
     
     return None
 
+def _icon_disk_path(exe_path):
+    """Ruta del icono cacheado en disco para exe_path, o None.
+
+    El nombre es <hash de la ruta>-<hash de mtime y tamaño>: si la app se
+    actualiza el icono se vuelve a extraer, y la entrada anterior del mismo
+    ejecutable se reconoce por el prefijo (ver _prune_icon_cache).
+    """
+    import hashlib
+    try:
+        st = os.stat(exe_path)
+        appdata = os.getenv('APPDATA')
+        if not appdata:
+            return None
+    except OSError:
+        return None
+    path_key = hashlib.blake2b(exe_path.lower().encode('utf-8'), digest_size=12).hexdigest()
+    version_key = hashlib.blake2b(f"{st.st_mtime_ns}|{st.st_size}".encode('ascii'), digest_size=6).hexdigest()
+    return os.path.join(appdata, 'volume-mixer', 'icon_cache', f"{path_key}-{version_key}.b64")
+
+def _prune_icon_cache(cache_path):
+    """Borra las entradas viejas del mismo ejecutable que cache_path.
+
+    También las de nombre antiguo (sin '-'), que ya no se leen nunca.
+    """
+    folder, name = os.path.split(cache_path)
+    prefix = name.split('-', 1)[0] + '-'
+    try:
+        with os.scandir(folder) as entries:
+            stale = [e.path for e in entries
+                     if e.name != name and e.name.endswith('.b64')
+                     and (e.name.startswith(prefix) or '-' not in e.name)]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
 def get_app_icon_base64(exe_path):
     """Extrae el icono del ejecutable y lo devuelve como PNG base64.
 
@@ -527,11 +1051,38 @@ def get_app_icon_base64(exe_path):
     1. Extraer desde el ejecutable directamente
     2. Buscar en acceso directo .lnk del Start Menu
     
+    El data URI resultante se guarda en disco (icon_cache/<hash>-<hash>.b64)
+    para no repetir la extracción GDI + redimensionado en el siguiente arranque.
+    
     Si falla, devuelve None.
     """
     if not exe_path:
         return None
     
+    cache_path = _icon_disk_path(exe_path)
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='ascii') as f:
+                cached = f.read()
+            if cached:
+                return cached
+        except OSError:
+            pass
+    
+    result = _extract_app_icon(exe_path)
+    if result and cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'w', encoding='ascii') as f:
+                f.write(result)
+        except OSError:
+            pass
+        else:
+            _prune_icon_cache(cache_path)
+    return result
+
+def _extract_app_icon(exe_path):
+    """Extrae el icono (ejecutable y, si no, acceso directo) sin caché de disco"""
     # Intenta extraer desde el ejecutable
     try:
         result = extract_icon_from_file(exe_path, 0)
@@ -561,22 +1112,28 @@ def list_sessions():
     """
     sessions_out = []
     try:
-        sessions = AudioUtilities.GetAllSessions()
+        sessions = _get_sessions()
     except Exception as e:
         print(f"[AUDIO] Error obteniendo sesiones: {e}")
         return sessions_out
 
+    by_pid = {}
     for session in sessions:
         try:
-            if not session.Process:
+            # session.Process es una propiedad de pycaw: se evalúa una vez
+            process = session.Process
+            if not process:
                 continue
-            pid = session.Process.pid
+            pid = process.pid
             volume_control = session.SimpleAudioVolume
             if not volume_control:
                 continue
+            by_pid.setdefault(pid, volume_control)
             volume = int(volume_control.GetMasterVolume() * 100)
-            is_muted = bool(volume_control.GetMute()) if hasattr(volume_control, 'GetMute') else False
-            name = get_app_name_clean(pid)
+            is_muted = bool(volume_control.GetMute()) if _has_com_method(volume_control, 'GetMute') else False
+            # pycaw ya trae el psutil.Process: no crear otro para leer el exe
+            exe_path = _process_exe(process)
+            name = _name_from_exe(exe_path)
             sessions_out.append({
                 "name": name,
                 "pid": pid,
@@ -585,6 +1142,7 @@ def list_sessions():
             })
         except Exception as e:
             print(f"[AUDIO] Error procesando sesión: {e}")
+    _remember_controls(sessions, by_pid)
     return sessions_out
 
 
@@ -592,13 +1150,10 @@ def set_app_volume(pid, volume):
     """Establece volumen (0-100) para una app por PID."""
     try:
         volume = max(0, min(100, int(volume)))
-        sessions = AudioUtilities.GetAllSessions()
-        for session in sessions:
-            if session.Process and session.Process.pid == pid:
-                ctrl = session.SimpleAudioVolume
-                if ctrl:
-                    ctrl.SetMasterVolume(volume / 100.0, None)
-                return True
+        ctrl = _session_control(pid)
+        if ctrl:
+            ctrl.SetMasterVolume(volume / 100.0, None)
+            return True
     except Exception as e:
         print(f"[AUDIO] Error set_app_volume: {e}")
     return False
@@ -607,14 +1162,12 @@ def set_app_volume(pid, volume):
 def toggle_mute(pid):
     """Alterna mute de una app por PID."""
     try:
-        sessions = AudioUtilities.GetAllSessions()
-        for session in sessions:
-            if session.Process and session.Process.pid == pid:
-                ctrl = session.SimpleAudioVolume
-                if ctrl and hasattr(ctrl, 'GetMute') and hasattr(ctrl, 'SetMute'):
-                    current = bool(ctrl.GetMute())
-                    ctrl.SetMute(not current, None)
-                return True
+        ctrl = _session_control(pid)
+        if ctrl:
+            if _has_com_method(ctrl, 'GetMute') and _has_com_method(ctrl, 'SetMute'):
+                current = bool(ctrl.GetMute())
+                ctrl.SetMute(not current, None)
+            return True
     except Exception as e:
         print(f"[AUDIO] Error toggle_mute: {e}")
     return False
@@ -637,18 +1190,57 @@ def set_master(volume):
         return False
 
 
-if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "--icons":
-        print("Iconos extraídos:")
-        for s in list_sessions():
-            icon = get_app_icon_base64(psutil.Process(s['pid']).exe()) if s.get('pid') else None
-            print(f"{s['name']} | icon_len={len(icon) if icon else 0}")
-        sys.exit(0)
-    else:
-        print("Sesiones:")
-        for s in list_sessions():
-            print(s)
+# Iconos por ruta de ejecutable. La primera vez que aparece un exe la
+# extracción (GDI + PIL + PNG, o el .lnk por COM) va a un hilo aparte y la
+# sesión sale sin icono; al terminar se avisa a los SessionWatcher activos
+# para re-enumerar. ~256 iconos base64 de unos KB: memoria acotada
+ICON_CACHE_MAX = 256
+_icons = {}  # exe_path -> data URI o None (sin icono)
+_icons_pending = set()
+_icons_lock = threading.Lock()
+_icon_executor = None
+_icon_listeners = set()  # notify() de los SessionWatcher registrados
+
+
+def _icon_async(exe_path):
+    """Icono ya extraído de exe_path; si aún no lo está, lo pide y devuelve None"""
+    global _icon_executor
+    if not exe_path:
+        return None
+    with _icons_lock:
+        try:
+            return _icons[exe_path]
+        except KeyError:
+            pass
+        if exe_path in _icons_pending:
+            return None
+        _icons_pending.add(exe_path)
+        if _icon_executor is None:
+            # COM inicializado en el hilo: el fallback del .lnk usa WScript.Shell
+            _icon_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='icons',
+                                                initializer=_com_thread_init)
+    _icon_executor.submit(_load_icon, exe_path)
+    return None
+
+
+def _load_icon(exe_path):
+    """Extrae el icono en el hilo de iconos y avisa si hay uno nuevo"""
+    try:
+        icon = get_app_icon_base64(exe_path)
+    except Exception:
+        icon = None
+    with _icons_lock:
+        if len(_icons) >= ICON_CACHE_MAX:
+            _icons.clear()
+        _icons[exe_path] = icon
+        _icons_pending.discard(exe_path)
+        listeners = list(_icon_listeners) if icon else ()
+    for notify in listeners:
+        try:
+            notify()
+        except Exception:
+            pass
+
 
 class AudioManager:
     """Gestiona sesiones de audio"""
@@ -657,17 +1249,33 @@ class AudioManager:
         self.sessions = []
         self.selected_index = 0
         self.navigation_mode = False
-        self.icon_cache = {}
-        self.name_cache = {}
+        # sessions/selected_index se tocan desde el hook de teclado y desde
+        # el hilo de audio; reentrante porque change_volume llama a get_state
+        self.lock = threading.RLock()
+        # Lista ya lista para serializar: se reconstruye en update_sessions y
+        # get_state solo mueve el flag isSelected
+        self._render_cache = []
+        self._render_selected = -1
+        # Si se asigna (ThreadPoolExecutor de un hilo), los SetMute de
+        # set_mute van a ese hilo en orden; si no, se aplican en el momento
+        self.mute_executor = None
+        # Cachés LRU por ruta de ejecutable, compartidas entre instancias
+        self.icon_cache = _icon_async
+        self.name_cache = _name_from_exe
 
 # Métodos de AudioManager
 def update_sessions(self):
     """Actualiza lista de sesiones con caché optimizado"""
     sessions_dict = {}
-    sessions = AudioUtilities.GetAllSessions()
+    # Siempre enumeración fresca; de paso renueva la caché de este hilo
+    sessions = _refresh_sessions()
+    by_pid = {}
     
     for session in sessions:
-        if not (session.Process and session.Process.name()):
+        # session.Process es una propiedad de pycaw: se evalúa una vez. El
+        # nombre sale del exe (cacheado), así que no hace falta process.name()
+        process = session.Process
+        if not process:
             continue
             
         volume_control = session.SimpleAudioVolume
@@ -675,29 +1283,15 @@ def update_sessions(self):
             continue
             
         volume = int(volume_control.GetMasterVolume() * 100)
-        is_muted = bool(volume_control.GetMute()) if hasattr(volume_control, 'GetMute') else False
-        pid = session.Process.pid
+        is_muted = bool(volume_control.GetMute()) if _has_com_method(volume_control, 'GetMute') else False
+        pid = process.pid
+        by_pid.setdefault(pid, volume_control)
         
-        try:
-            exe_path = session.Process.exe()
-        except:
-            exe_path = None
+        exe_path = _process_exe(process)
         
-        # Obtener nombre con caché
-        if exe_path and exe_path in self.name_cache:
-            clean_name = self.name_cache[exe_path]
-        else:
-            clean_name = get_app_name_clean(pid)
-            if exe_path:
-                self.name_cache[exe_path] = clean_name
-        
-        # Obtener icono con caché
-        if exe_path and exe_path in self.icon_cache:
-            icon_data = self.icon_cache[exe_path]
-        else:
-            icon_data = get_app_icon_base64(exe_path)
-            if exe_path:
-                self.icon_cache[exe_path] = icon_data
+        # Nombre e icono cacheados por ruta de ejecutable
+        clean_name = self.name_cache(exe_path)
+        icon_data = self.icon_cache(exe_path)
         
         if not icon_data:
             icon_data = './assets/noicon.png'
@@ -711,102 +1305,322 @@ def update_sessions(self):
                 'pid': pid,
                 'isMuted': is_muted,
                 '_controls': [volume_control],
-                '_mutes': [is_muted]
+                '_vol_sum': volume,
+                '_count': 1
             }
         else:
+            # Media y mute acumulados: no se vuelve a consultar COM por cada control ya agrupado
             existing = sessions_dict[clean_name]
             existing['_controls'].append(volume_control)
-            existing['volume'] = int(sum(vc.GetMasterVolume() * 100 for vc in existing['_controls']) / len(existing['_controls']))
-            existing['_mutes'].append(is_muted)
-            existing['isMuted'] = any(existing['_mutes'])
+            existing['_vol_sum'] += volume
+            existing['_count'] += 1
+            existing['isMuted'] = existing['isMuted'] or is_muted
+    
+    _remember_controls(sessions, by_pid)
     
     # Convertir a lista
-    self.sessions = []
+    new_sessions = []
     for session_data in sessions_dict.values():
-        controls = session_data.pop('_controls')
-        session_data.pop('_mutes', None)
-        session_data['_controls'] = controls
-        self.sessions.append(session_data)
-    
-    if self.selected_index >= len(self.sessions):
-        self.selected_index = max(0, len(self.sessions) - 1)
+        # La media se calcula una vez por grupo, no en cada control añadido
+        vol_sum = session_data.pop('_vol_sum')
+        count = session_data.pop('_count')
+        if count > 1:
+            session_data['volume'] = vol_sum // count
+        new_sessions.append(session_data)
     
-    return self.get_state()
+    # La enumeración COM va fuera del lock; solo el intercambio va dentro
+    with self.lock:
+        self.sessions = new_sessions
+        self._render_cache = [{
+            'name': s['name'],
+            'icon': s['icon'],
+            'volume': s['volume'],
+            'isSelected': False,
+            'isMuted': s.get('isMuted', False)
+        } for s in new_sessions]
+        self._render_selected = -1
+        if self.selected_index >= len(self.sessions):
+            self.selected_index = max(0, len(self.sessions) - 1)
+        return self.get_state()
 
 def get_state(self):
     """Obtiene estado actual"""
-    sessions_data = []
-    for i, session in enumerate(self.sessions):
-        sessions_data.append({
-            'name': session['name'],
-            'icon': session['icon'],
-            'volume': session['volume'],
-            'isSelected': i == self.selected_index,
-            'isMuted': session.get('isMuted', False)
-        })
-    
-    return {
-        'sessions': sessions_data,
-        'selectedIndex': self.selected_index,
-        'navigationMode': self.navigation_mode
-    }
+    with self.lock:
+        cache = self._render_cache
+        if self._render_selected != self.selected_index:
+            if 0 <= self._render_selected < len(cache):
+                cache[self._render_selected]['isSelected'] = False
+            if 0 <= self.selected_index < len(cache):
+                cache[self.selected_index]['isSelected'] = True
+            self._render_selected = self.selected_index
+        
+        return {
+            'sessions': cache,
+            'selectedIndex': self.selected_index,
+            'navigationMode': self.navigation_mode
+        }
 
 def set_volume(self, index, volume):
     """Establece volumen de una sesión"""
-    if not (0 <= index < len(self.sessions)):
-        return False
-    
-    session = self.sessions[index]
+    with self.lock:
+        if not (0 <= index < len(self.sessions)):
+            return False
+        session = self.sessions[index]
     for control in session.get('_controls', []):
         try:
             control.SetMasterVolume(volume / 100.0, None)
         except:
             pass
-    session['volume'] = volume
+    with self.lock:
+        session['volume'] = volume
+        # Si update_sessions cambió la lista mientras tanto, la caché ya es nueva
+        if index < len(self.sessions) and self.sessions[index] is session:
+            self._render_cache[index]['volume'] = volume
     return True
 
+def set_mute(self, index, mute):
+    """Mutea o desmutea una sesión (todos sus controles agrupados)"""
+    with self.lock:
+        if not (0 <= index < len(self.sessions)):
+            return False
+        session = self.sessions[index]
+        # Se encola dentro del lock: los SetMute llegan en el orden de los cambios
+        if self.mute_executor is not None:
+            self.mute_executor.submit(_set_mute, session.get('_controls', []), mute)
+        else:
+            _set_mute(session.get('_controls', []), mute)
+        session['isMuted'] = mute
+        self._render_cache[index]['isMuted'] = mute
+    return True
+
+def _set_mute(controls, mute):
+    """Aplica el mute a todos los controles de una sesión agrupada"""
+    for control in controls:
+        try:
+            control.SetMute(mute, None)
+        except Exception as e:
+            # Puede correr en un hilo aparte: sin esto el fallo no se vería
+            print(f"[AUDIO] No se pudo aplicar el mute: {e}")
+
 # Reasignar métodos a la clase
 AudioManager.update_sessions = update_sessions
 AudioManager.get_state = get_state
 AudioManager.set_volume = set_volume
+AudioManager.set_mute = set_mute
 
 def change_volume(self, delta):
     """Cambia volumen de sesión seleccionada y desmutea automáticamente"""
-    if not self.sessions:
-        return None
-    
-    session = self.sessions[self.selected_index]
-    new_vol = max(0, min(100, session['volume'] + delta))
-    
-    # Desmutear al ajustar volumen
-    if session.get('isMuted', False):
-        for control in session.get('_controls', []):
-            try:
-                control.SetMute(False, None)
-            except:
-                pass
-        session['isMuted'] = False
-    
-    self.set_volume(self.selected_index, new_vol)
-    return self.get_state()
+    with self.lock:
+        if not self.sessions:
+            return None
+        
+        session = self.sessions[self.selected_index]
+        new_vol = max(0, min(100, session['volume'] + delta))
+        
+        # Desmutear al ajustar volumen
+        if session.get('isMuted', False):
+            self.set_mute(self.selected_index, False)
+        
+        self.set_volume(self.selected_index, new_vol)
+        return self.get_state()
 
 def next_session(self):
     """Siguiente sesión"""
-    if self.sessions:
-        self.selected_index = (self.selected_index + 1) % len(self.sessions)
-    return self.get_state()
+    with self.lock:
+        if self.sessions:
+            self.selected_index = (self.selected_index + 1) % len(self.sessions)
+        return self.get_state()
 
 def prev_session(self):
     """Sesión anterior"""
-    if self.sessions:
-        self.selected_index = (self.selected_index - 1) % len(self.sessions)
-    return self.get_state()
+    with self.lock:
+        if self.sessions:
+            self.selected_index = (self.selected_index - 1) % len(self.sessions)
+        return self.get_state()
 
 AudioManager.change_volume = change_volume
 AudioManager.next_session = next_session
 AudioManager.prev_session = prev_session
 
 
+def _com_thread_init():
+    """Inicializa COM en el hilo de audio (pycaw lo necesita en cada hilo).
+
+    Apartamento multihilo (MTA): Windows entrega los callbacks de sesión
+    (IAudioSessionNotification/IAudioSessionEvents) desde sus propios hilos
+    sin que este tenga que bombear mensajes.
+    """
+    try:
+        _audio_utilities()
+        import comtypes
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+    except Exception as e:
+        print(f"[AUDIO] No se pudo inicializar COM en el hilo de audio: {e}")
+
+
+# Con eventos de sesión: espera para agrupar ráfagas y sondeo de respaldo
+EVENT_COALESCE_DELAY = 0.05  # segundos
+EVENT_FALLBACK_INTERVAL = 10  # segundos
+# Lo que espera el hook de teclado a la enumeración si la lista está vieja
+STALE_REFRESH_TIMEOUT = 0.25  # segundos
+
+
+def _session_callbacks(notify):
+    """Clases de callbacks de pycaw que llaman a notify() sin argumentos.
+
+    pycaw pasa a cada callback los datos del evento (volumen, estado, motivo
+    de la desconexión...), que aquí no interesan. None si no hay callbacks.
+    """
+    try:
+        from pycaw.callbacks import AudioSessionNotification, AudioSessionEvents
+    except ImportError:
+        return None
+
+    def _notify(*_):
+        notify()
+
+    class _SessionCreated(AudioSessionNotification):
+        on_session_created = staticmethod(_notify)
+
+    class _SessionEvents(AudioSessionEvents):
+        on_simple_volume_changed = staticmethod(_notify)
+        on_state_changed = staticmethod(_notify)
+        on_session_disconnected = staticmethod(_notify)
+
+    return _SessionCreated, _SessionEvents
+
+
+class SessionWatcher:
+    """Llama a notify() cuando aparece una sesión o cambia su volumen/estado.
+
+    Registra IAudioSessionNotification en el gestor de sesiones y un
+    IAudioSessionEvents compartido en cada sesión enumerada. Se usa siempre
+    desde el mismo hilo que refresca las sesiones (las cachés son por hilo);
+    notify() llega desde hilos de Windows.
+    """
+
+    def __init__(self, notify):
+        self.notify = notify
+        self._notifier = None  # (IAudioSessionManager2, cliente) registrados
+        self._events = None  # IAudioSessionEvents compartido por todas las sesiones
+
+    def start(self):
+        """Registra el aviso de sesiones nuevas; False si no hay callbacks."""
+        callbacks = _session_callbacks(self.notify)
+        if callbacks is None:
+            return False
+        _SessionCreated, _SessionEvents = callbacks
+        try:
+            self._unregister()
+            manager = _speakers().AudioSessionManager
+            client = _SessionCreated()
+            manager.RegisterSessionNotification(client)
+            # Windows no avisa de sesiones nuevas hasta pedir un enumerador
+            manager.GetSessionEnumerator()
+        except Exception as e:
+            print(f"[AUDIO] Sin eventos de sesión, se sondeará periódicamente: {e}")
+            return False
+        self._notifier = (manager, client)
+        # Un icono recién extraído también cambia lo que se muestra
+        with _icons_lock:
+            _icon_listeners.add(self.notify)
+        if self._events is None:
+            self._events = _SessionEvents()
+        return True
+
+    def watch(self):
+        """Suscribe las sesiones de la última enumeración de este hilo."""
+        if self._notifier is None:
+            return
+        if self._notifier[0] is not _speakers().AudioSessionManager:
+            # Cambió el dispositivo por defecto: suscribirse al nuevo
+            if not self.start():
+                return
+        events = self._events
+        cache = getattr(_sessions_local, 'cache', None)
+        for session in cache[1] if cache else ():
+            try:
+                # No-op si el wrapper (reutilizado) ya estaba suscrito
+                session.register_notification(events)
+            except Exception:
+                pass
+
+    def stop(self):
+        """Deja de recibir el aviso de sesiones nuevas."""
+        self._unregister()
+
+    def _unregister(self):
+        with _icons_lock:
+            _icon_listeners.discard(self.notify)
+        if self._notifier is not None:
+            manager, client = self._notifier
+            self._notifier = None
+            try:
+                manager.UnregisterSessionNotification(client)
+            except Exception:
+                pass
+
+
+def _new_event_loop():
+    """Loop de winloop (en requirements.txt para Windows); si no, el de asyncio.
+
+    Se crea el loop directamente en lugar de cambiar la política global de
+    asyncio, así el hilo de Qt y el de la bandeja no se ven afectados.
+    """
+    try:
+        import winloop
+        return winloop.new_event_loop()
+    except Exception as e:
+        print(f"[ASYNC] winloop no disponible, se usa asyncio: {e}")
+        return asyncio.new_event_loop()
+
+
+# Cada cuánto VolumeApp comprueba si settings.json cambió
+CONFIG_POLL_INTERVAL = 1  # segundos
+
+
+def _snapshot_state(state):
+    """Copia del estado independiente de la caché de render (que se reutiliza)"""
+    return {**state, 'sessions': [dict(session) for session in state['sessions']]}
+
+
+def _state_patch(old, new):
+    """Operaciones JSON Patch (RFC 6902, solo 'replace') para pasar de old a new.
+
+    Si cambia la lista de sesiones (altas, bajas u orden) se reemplaza
+    /sessions entera; si no, solo los campos que cambian en cada sesión,
+    así un cambio de volumen no reenvía los iconos.
+    """
+    ops = []
+    old_sessions, new_sessions = old['sessions'], new['sessions']
+    if len(old_sessions) != len(new_sessions) or any(
+            a['name'] != b['name'] for a, b in zip(old_sessions, new_sessions)):
+        ops.append({'op': 'replace', 'path': '/sessions', 'value': new_sessions})
+    else:
+        for i, (a, b) in enumerate(zip(old_sessions, new_sessions)):
+            for field, value in b.items():
+                if a.get(field) != value:
+                    ops.append({'op': 'replace', 'path': f'/sessions/{i}/{field}', 'value': value})
+    for key, value in new.items():
+        if key != 'sessions' and old.get(key) != value:
+            ops.append({'op': 'replace', 'path': f'/{key}', 'value': value})
+    return ops
+
+
+# Búfer de salida por conexión antes de que send() espere a drain()
+WS_WRITE_LIMIT = 2 ** 20  # bytes
+
+
+# Espera máxima de broadcast() por los clientes sin websockets.broadcast
+BROADCAST_TIMEOUT = 0.25  # segundos
+
+
+def _consume_send_error(task):
+    """Recoge el error de un envío que terminó tras el broadcast"""
+    if not task.cancelled():
+        task.exception()
+
+
 class VolumeApp:
     """Aplicación integrada"""
     
@@ -814,66 +1628,231 @@ class VolumeApp:
         self.audio_manager = AudioManager()
         self.clients = set()
         self.loop = None
+        self._stop = None  # asyncio.Event; se crea en run() junto al loop
+        self._ws_broadcast = None  # websockets.broadcast (websockets >= 10)
         self.electron_process = None
-        self.last_session_count = 0
-        self.update_interval = 1  # Actualizar cada 1 segundo
+        self.update_interval = 1  # Actualizar cada 1 segundo (sin eventos de sesión)
+        # Con eventos de pycaw el bucle despierta al cambiar algo y solo
+        # sondea cada EVENT_FALLBACK_INTERVAL como red de seguridad
+        self._sessions_changed = None  # asyncio.Event; se crea en run()
+        self._session_watcher = SessionWatcher(self._notify_sessions_changed)
+        self._pending_update = None  # Future de la enumeración en curso
+        # Un único hilo para la enumeración COM/iconos: no bloquea el loop
+        # de asyncio y serializa el acceso a COM (y a la caché de endpoint)
+        self.audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audio', initializer=_com_thread_init)
+        # (huella, json) del último estado serializado; una sola tupla para
+        # que el hilo del hook y el loop nunca vean una pareja a medias
+        self._last_state = (None, None)
+        # Último estado del hook aún sin enviar: una ráfaga de teclas (rueda
+        # girando) se queda en un solo frame con el estado más reciente
+        self._kbd_state = None
+        self._kbd_lock = threading.Lock()
+        self._kbd_wake = None  # asyncio.Event que despierta a _keyboard_writer
+        # Sin clientes el bucle periódico no enumera: la lista queda vieja y
+        # la próxima tecla del hook la refresca antes de actuar
+        self._sessions_stale = True
+        # Clientes que pidieron 'subscribe_patches': reciben solo los cambios
+        # (JSON Patch) respecto a _patch_base, el último estado que tienen
+        self._patch_clients = set()
+        self._patch_base = None
+    
+    @staticmethod
+    def _state_key(state):
+        """Huella de lo que muestra la UI.
+
+        Incluye el icono: llega después que la sesión (se extrae en segundo
+        plano) y sin él los clientes se quedarían con el de reserva. El hash
+        de cada cadena se calcula una vez y queda guardado en el objeto.
+        """
+        return hash((
+            tuple((s['name'], s['icon'], s['volume'], s['isSelected'], s['isMuted']) for s in state['sessions']),
+            state['selectedIndex'],
+            state['navigationMode'],
+        ))
+    
+    def _state_message(self, state, show=False):
+        """Serializa el estado solo si cambió; devuelve (mensaje, cambió).
+
+        Con show=True el frame lleva además 'show': la UI se muestra y se
+        actualiza con un solo mensaje. Ese frame no se guarda (no debe
+        llegar a clientes nuevos), pero la huella sí, para que el bucle
+        periódico no reenvíe el mismo estado.
+        """
+        key = self._state_key(state)
+        last_key, last_json = self._last_state
+        changed = key != last_key
+        if show:
+            self._last_state = (key, None if changed else last_json)
+            return _dumps({'type': 'state', 'show': True, 'data': state}), changed
+        if not changed and last_json is not None:
+            return last_json, False
+        message = _dumps({'type': 'state', 'data': state})
+        self._last_state = (key, message)
+        return message, changed
+    
+    async def _update_sessions(self):
+        """Ejecuta update_sessions en el hilo de audio sin bloquear el loop.
+
+        Las llamadas simultáneas (varios clientes conectando o pidiendo
+        get_state a la vez, más el bucle periódico) comparten la enumeración
+        en curso en lugar de encolar una cada una.
+        """
+        future = self._pending_update
+        if future is None:
+            future = self._pending_update = self.loop.run_in_executor(self.audio_executor, self._update_and_watch)
+            future.add_done_callback(self._clear_pending_update)
+        # shield: si se cancela quien espera, la enumeración compartida sigue
+        return await asyncio.shield(future)
+    
+    def _clear_pending_update(self, future):
+        self._pending_update = None
+    
+    def _update_and_watch(self):
+        """update_sessions + suscribir las sesiones nuevas a sus eventos (hilo de audio)"""
+        state = self.audio_manager.update_sessions()
+        self._sessions_stale = False
+        self._session_watcher.watch()
+        return state
+    
+    def _notify_sessions_changed(self, *args):
+        """Callback COM (hilo de Windows): despierta el bucle de actualización"""
+        try:
+            self.loop.call_soon_threadsafe(self._sessions_changed.set)
+        except RuntimeError:
+            pass  # loop ya cerrado
     
     async def register(self, websocket):
         """Registra cliente"""
         self.clients.add(websocket)
-        await websocket.send(json.dumps({
-            'type': 'state',
-            'data': self.audio_manager.update_sessions()
-        }))
+        await self._send_state(websocket, await self._update_sessions())
         print(f"[OK] Cliente conectado. Total: {len(self.clients)}")
     
     async def unregister(self, websocket):
         """Desregistra cliente"""
         self.clients.discard(websocket)
+        self._patch_clients.discard(websocket)
         print(f"[DISCONNECTED] Cliente desconectado. Total: {len(self.clients)}")
     
-    async def broadcast(self, message):
-        """Envía mensaje a todos"""
-        if self.clients:
-            await asyncio.gather(
-                *[client.send(message) for client in self.clients],
-                return_exceptions=True
-            )
+    async def broadcast(self, message, clients=None):
+        """Envía mensaje a todos (o a los clientes indicados).
+
+        El JSON se codifica a UTF-8 una sola vez y todos los clientes reciben
+        el mismo objeto bytes (frame binario con el JSON). Con
+        websockets.broadcast el frame se escribe en cada conexión sin crear
+        tareas ni recoger resultados; los clientes caídos se omiten solos.
+        """
+        if clients is None:
+            clients = self.clients
+        if not clients:
+            return
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        if self._ws_broadcast is not None:
+            self._ws_broadcast(clients, message)
+            return
+        # Sin websockets.broadcast: un envío por cliente, con el mismo bytes.
+        # Se espera como mucho BROADCAST_TIMEOUT para que un cliente lento no
+        # frene el bucle de actualización; sus envíos terminan por su cuenta
+        tasks = [asyncio.ensure_future(client.send(message)) for client in list(clients)]
+        done, pending = await asyncio.wait(tasks, timeout=BROADCAST_TIMEOUT)
+        for task in done:
+            # Consumir errores de clientes caídos (equivale a return_exceptions=True)
+            task.exception()
+        for task in pending:
+            task.add_done_callback(_consume_send_error)
     
     async def update_sessions_periodically(self):
-        """Actualiza sesiones periódicamente solo si hay cambios"""
+        """Actualiza sesiones al recibir eventos de audio (o periódicamente) solo si hay cambios"""
+        watching = await self.loop.run_in_executor(self.audio_executor, self._session_watcher.start)
+        interval = EVENT_FALLBACK_INTERVAL if watching else self.update_interval
         while True:
             try:
-                await asyncio.sleep(self.update_interval)
-                state = self.audio_manager.update_sessions()
-                current_count = len(state.get('sessions', []))
-                
-                if current_count != self.last_session_count:
-                    self.last_session_count = current_count
-                    await self.broadcast(json.dumps({
-                        'type': 'state',
-                        'data': state
-                    }))
+                try:
+                    await asyncio.wait_for(self._sessions_changed.wait(), interval)
+                    # Agrupar la ráfaga de eventos (p. ej. arrastrar un slider)
+                    await asyncio.sleep(EVENT_COALESCE_DELAY)
+                except asyncio.TimeoutError:
+                    pass
+                self._sessions_changed.clear()
+                # Sin clientes no hay a quién avisar: register() enumera al
+                # conectar y el hook de teclado, en su próxima tecla
+                if not self.clients:
+                    self._sessions_stale = True
+                    continue
+                state = await self._update_sessions()
+                # Volumen, mute, selección o sesiones nuevas; sin cambios no se serializa nada
+                await self._publish(state)
             except Exception as e:
                 print(f"[UPDATE] Error: {e}")
     
+    async def _publish(self, state, show=False):
+        """Envía el estado: entero a los clientes normales, como JSON Patch a los suscritos.
+
+        Es el único que actualiza la huella (_last_state). Devuelve True si
+        se envió algo.
+        """
+        if not self.clients:
+            # Nadie escucha: ni huella ni JSON (register() serializa al conectar)
+            return False
+        message, changed = self._state_message(state, show=show)
+        if not (changed or show):
+            return False
+        patch_clients = self._patch_clients
+        if not patch_clients:
+            await self.broadcast(message)
+            return True
+        await self.broadcast(message, self.clients - patch_clients)
+        snapshot = _snapshot_state(state)
+        frame = {'type': 'patch', 'ops': _state_patch(self._patch_base, snapshot)}
+        self._patch_base = snapshot
+        if show:
+            frame['show'] = True
+        elif not frame['ops']:
+            return True
+        await self.broadcast(_dumps(frame), patch_clients)
+        return True
+
+    async def _send_state(self, websocket, state):
+        """Envía el estado completo a un cliente (al conectar o con get_state).
+
+        Si el estado cambió desde el último envío se publica a todos, no solo
+        a este cliente: si no, la huella quedaría al día sin que el resto de
+        clientes recibiera el cambio.
+        """
+        key = self._state_key(state)
+        if key != self._last_state[0]:
+            # Un cliente normal ya lo recibe en el broadcast
+            if await self._publish(state) and websocket not in self._patch_clients:
+                return
+        last_key, last_json = self._last_state
+        if last_key != key or last_json is None:
+            last_json = _dumps({'type': 'state', 'data': state})
+        await websocket.send(last_json)
+    
+    async def _subscribe_patches(self, websocket):
+        """Pasa un cliente a recibir parches; antes recibe el estado base"""
+        if not self._patch_clients or self._patch_base is None:
+            # Nadie más depende de la base: partir del estado actual
+            self._patch_base = _snapshot_state(await self._update_sessions())
+        self._patch_clients.add(websocket)
+        await websocket.send(_dumps({'type': 'state', 'data': self._patch_base}))
+    
     async def handler(self, websocket):
         """Handler WebSocket"""
         await self.register(websocket)
         try:
             async for message in websocket:
                 try:
-                    data = json.loads(message)
+                    data = _loads(message)
                     msg_type = data.get('type')
                     
                     if msg_type == 'get_state':
-                        state = self.audio_manager.update_sessions()
-                        await websocket.send(json.dumps({
-                            'type': 'state',
-                            'data': state
-                        }))
+                        await self._send_state(websocket, await self._update_sessions())
+                    elif msg_type == 'subscribe_patches':
+                        await self._subscribe_patches(websocket)
                 except Exception as e:
-                    print(f"Error: {e}")
+                    if VERBOSE:
+                        print(f"[WS] Mensaje no válido: {e}")
         finally:
             await self.unregister(websocket)
     
@@ -884,95 +1863,197 @@ class VolumeApp:
         if event.event_type != 'down':
             return True
         
-        # Refrescar configuración si cambió
-        refresh_config_if_changed()
-        
-        volume_up = event.name == 'volume up'
-        volume_down = event.name == 'volume down'
-        volume_mute = event.name == 'volume mute'
-        
-        if not (volume_up or volume_down or volume_mute):
+        # El hook ve todas las teclas: descartar el resto con una sola búsqueda
+        action = _KEY_ACTIONS.get(event.name)
+        if action is None:
             return True
         
-        # Guardar volumen maestro
-        last_master_volume = get_master_volume()
+        if self._sessions_stale:
+            # Primera tecla sin clientes conectados: sesiones al día antes de
+            # actuar (en el hilo de audio, que tiene COM y la caché de sesiones)
+            try:
+                self.audio_executor.submit(self._update_and_watch).result(STALE_REFRESH_TIMEOUT)
+            except Exception as e:
+                print(f"[AUDIO] Error refrescando sesiones: {e}")
         
-        state = None
+        # Guardar volumen maestro (config_data ya lo mantiene _config_watcher)
+        last_master_volume = get_master_volume_cached()
         
-        if volume_mute:
-            self.audio_manager.navigation_mode = not self.audio_manager.navigation_mode
-            state = self.audio_manager.get_state()
-        elif volume_up or volume_down:
-            if self.audio_manager.navigation_mode:
-                state = self.audio_manager.next_session() if volume_up else self.audio_manager.prev_session()
-            else:
-                volume_delta = config_data.get('volumeDelta', 5)
-                delta = volume_delta if volume_up else -volume_delta
-                state = self.audio_manager.change_volume(delta)
+        state = action(self)
         
-        # Enviar actualizaciones
+        # Enviar actualizaciones (mostrar + estado en un único frame); se
+        # serializa en el loop, fuera del hook
+        wake = False
         if state:
-            try:
-                asyncio.run_coroutine_threadsafe(
-                    self.broadcast(json.dumps({'type': 'show'})),
-                    self.loop
-                )
-                asyncio.run_coroutine_threadsafe(
-                    self.broadcast(json.dumps({'type': 'state', 'data': state})),
-                    self.loop
-                )
-            except Exception as e:
-                print(f"[ERROR] {e}")
+            with self._kbd_lock:
+                # Si ya hay un envío en cola, este estado sustituye al anterior
+                wake = self._kbd_state is None
+                self._kbd_state = state
         
-        # Restaurar volumen maestro
-        if last_master_volume is not None:
-            time.sleep(0.05)
-            current_volume = get_master_volume()
-            if current_volume != last_master_volume:
-                set_master_volume(last_master_volume)
+        # Un solo salto al loop por tecla: despertar al escritor (sin Task ni
+        # Future) y programar la restauración del volumen maestro
+        target = last_master_volume
+        if wake or target is not None:
+            self.loop.call_soon_threadsafe(self._after_key, wake, target)
         
         return False
     
+    def _after_key(self, wake, target):
+        """Parte de handle_keyboard que corre en el loop"""
+        if wake:
+            self._kbd_wake.set()
+        if target is not None:
+            # Restaurar volumen maestro a los 50 ms, sin bloquear el hook
+            self.loop.call_later(0.05, self._restore_master, target)
+    
+    def _on_volume_mute(self):
+        """Mute: alterna entre modo volumen y modo navegación"""
+        self.audio_manager.navigation_mode = not self.audio_manager.navigation_mode
+        return self.audio_manager.get_state()
+    
+    def _on_volume_step(self, up):
+        """Arriba/abajo: cambia de sesión o de volumen según el modo"""
+        if self.audio_manager.navigation_mode:
+            return self.audio_manager.next_session() if up else self.audio_manager.prev_session()
+        volume_delta = config_data.get('volumeDelta', 5)
+        return self.audio_manager.change_volume(volume_delta if up else -volume_delta)
+    
+    async def _config_watcher(self):
+        """Recarga settings.json si cambió, fuera del hilo del hook"""
+        while True:
+            await asyncio.sleep(CONFIG_POLL_INTERVAL)
+            # Con watchdog solo mira un flag; sin él, un stat() por segundo
+            refresh_config_if_changed()
+    
+    async def _keyboard_writer(self):
+        """Envía el estado más reciente del hook cada vez que este lo avisa"""
+        while True:
+            await self._kbd_wake.wait()
+            self._kbd_wake.clear()
+            with self._kbd_lock:
+                state, self._kbd_state = self._kbd_state, None
+            if state is None:
+                continue
+            try:
+                await self._publish(state, show=True)
+            except Exception as e:
+                print(f"[ERROR] {e}")
+    
+    def _restore_master(self, target):
+        """Deshace el cambio de volumen maestro que aplica Windows por su cuenta"""
+        if get_master_volume_cached() != target:
+            set_master_volume(target)
+    
     
     async def start_server(self):
-        """Inicia servidor WebSocket"""
-        # Iniciar tarea de actualización periódica
-        update_task = asyncio.create_task(self.update_sessions_periodically())
+        """Inicia servidor WebSocket hasta que se llame a stop()"""
+        # Iniciar tarea de actualización periódica, el escritor del hook y
+        # la vigilancia de la configuración
+        tasks = (
+            asyncio.create_task(self.update_sessions_periodically()),
+            asyncio.create_task(self._keyboard_writer()),
+            asyncio.create_task(self._config_watcher()),
+        )
         
-        async with websockets.serve(self.handler, "localhost", 8765):
-            print("[OK] WebSocket server en ws://localhost:8765")
-            await asyncio.Future()  # run forever
+        import websockets
+        self._ws_broadcast = getattr(websockets, 'broadcast', None)
+
+        try:
+            # Sin permessage-deflate: el mismo frame se comprimiría una vez por
+            # cliente, y en localhost el ahorro de bytes no compensa la CPU.
+            # write_limit: un estado con iconos base64 pasa de los 32 KiB por
+            # defecto y cada envío esperaría a drain(). Sin pings: es
+            # localhost y un cliente caído se detecta al cerrar el socket
+            async with websockets.serve(self.handler, "localhost", 8765, compression=None,
+                                        write_limit=WS_WRITE_LIMIT, ping_interval=None):
+                print("[OK] WebSocket server en ws://localhost:8765")
+                await self._stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def stop(self):
+        """Detiene el servidor (seguro desde cualquier hilo)"""
+        if self.loop and self._stop:
+            self.loop.call_soon_threadsafe(self._stop.set)
     
     def run(self):
         """Inicia la aplicación de forma optimizada"""
+        import keyboard
+
         print("\n" + "="*60)
         print("  SOUNDBOARD MANAGER")
         print("="*60 + "\n")
         
         load_config()
         
-        self.loop = asyncio.new_event_loop()
+        self.loop = _new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._stop = asyncio.Event()
+        self._sessions_changed = asyncio.Event()
+        self._kbd_wake = asyncio.Event()
         
         keyboard.hook(self.handle_keyboard, suppress=True)
         print("[OK] Sistema iniciado\n")
         
         refresh_config_if_changed()
 
+        server = self.loop.create_task(self.start_server())
         try:
-            self.loop.run_until_complete(self.start_server())
+            self.loop.run_until_complete(server)
         except KeyboardInterrupt:
             print("\n[SHUTDOWN] Cerrando...")
+            # Cerrar el servidor y cancelar la tarea periódica ordenadamente
+            if not server.done():
+                self._stop.set()
+                self.loop.run_until_complete(server)
         except Exception as e:
             print(f"[ERROR] {e}")
         finally:
             keyboard.unhook_all()
+            self.audio_executor.shutdown(wait=False)
             try:
                 self.loop.close()
             except:
                 pass
 
 
+
+# Teclas que atiende el hook de VolumeApp -> acción (devuelve el estado nuevo)
+_KEY_ACTIONS = {
+    'volume up': lambda app: app._on_volume_step(True),
+    'volume down': lambda app: app._on_volume_step(False),
+    'volume mute': VolumeApp._on_volume_mute,
+}
+
+
+def _eager_import():
+    """Resuelve de golpe todos los imports diferidos (SBM_EAGER_IMPORT=1, p. ej. en CI)."""
+    _audio_utilities()
+    import psutil  # noqa: F401
+    _get_win32api()
+    _get_win32gui()
+    _get_win32ui()
+    _get_pil_image()
+
+
+if os.getenv('SBM_EAGER_IMPORT') == '1':
+    _eager_import()
+
+
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--icons":
+        import psutil
+        print("Iconos extraídos:")
+        for s in list_sessions():
+            icon = get_app_icon_base64(psutil.Process(s['pid']).exe()) if s.get('pid') else None
+            print(f"{s['name']} | icon_len={len(icon) if icon else 0}")
+        sys.exit(0)
+    print("Sesiones:")
+    for s in list_sessions():
+        print(s)
+
     app = VolumeApp()
     app.run()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+SoundBoard Manager - Configuración (settings.json)
+Sin dependencias de Qt: __main__ lee la config (paso de volumen, idioma de
+la bandeja) antes de importar la UI.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+# orjson (en requirements.txt) para settings.json: lee y escribe bytes
+# directamente; sin él, json con la misma salida (sangría de 2)
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+CONFIG_DIR = Path.home() / 'AppData' / 'Local' / 'SoundBoard Manager'
+CONFIG_FILE = CONFIG_DIR / 'settings.json'
+DEFAULT_CONFIG = {
+    'position': 'top-left',  # 9 positions
+    'offset_x': 10,
+    'offset_y': 10,
+    'language': 'es',  # default Spanish
+    'step': 4  # Tamano del paso de volumen (2-10)
+}
+
+# Última config leída o guardada: (st_mtime_ns, dict). El arranque la pide
+# desde varios hilos (main, bandeja, overlay); solo se relee si el fichero
+# cambió en disco
+_config_cache = None
+_config_lock = threading.Lock()
+
+def load_config():
+    global _config_cache
+    try:
+        # Sin exists() previo: si no hay fichero, la excepción da los defaults
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+        with _config_lock:
+            cached = _config_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1].copy()
+        config = {**DEFAULT_CONFIG, **_loads(CONFIG_FILE.read_bytes())}
+    except Exception:
+        return DEFAULT_CONFIG.copy()
+    with _config_lock:
+        _config_cache = (mtime, config)
+    return config.copy()
+
+def save_config(config):
+    global _config_cache
+    try:
+        with _config_lock:
+            cached = _config_cache
+        if cached is not None and cached[1] == config:
+            try:
+                if CONFIG_FILE.stat().st_mtime_ns == cached[0]:
+                    # Guardar sin cambios: el fichero ya tiene esto
+                    return True
+            except OSError:
+                pass
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        CONFIG_FILE.write_bytes(_dumps_pretty(config))
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+        with _config_lock:
+            _config_cache = (mtime, dict(config))
+        return True
+    except Exception as e:
+        print(f"[CONFIG] Error saving: {e}")
+        return False
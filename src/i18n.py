@@ -3,15 +3,71 @@
 Sistema de internacionalización (i18n)
 Descarga archivos de idioma desde GitHub y los cachea localmente
 """
+import http.client
 import json
-import urllib.request
+import sys
+import threading
+import types
+import urllib.parse
 from pathlib import Path
 from typing import Dict, Optional
 
+# orjson (en requirements.txt): lee/escribe la caché en bytes UTF-8 sin pasar
+# por str; sin él, json con la misma salida (UTF-8, sangría de 2)
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
 # Directorio de cache para idiomas
 CACHE_DIR = Path.home() / 'AppData' / 'Local' / 'SoundBoard Manager' / 'i18n'
 GITHUB_REPO = "https://raw.githubusercontent.com/seerrgiioo/SoundBoard-Manager/refs/heads/main/i18n"
 
+# Idiomas ya cargados (caché en disco o GitHub): volver a uno no toca el disco
+_LANG_CACHE: Dict[str, Dict] = {}
+# Idiomas con descarga de GitHub ya lanzada en este proceso (una por idioma)
+_FETCHED = set()
+_FETCHED_LOCK = threading.Lock()
+
+# Conexión HTTP(S) persistente (keep-alive) con el servidor de idiomas: la
+# segunda descarga ya no repite el handshake TCP/TLS
+_http_conn = None
+_HTTP_LOCK = threading.Lock()
+
+def _http_get(url: str, timeout: float = 5) -> bytes:
+    """GET reutilizando la conexión; si el servidor la cerró, reconecta una vez"""
+    global _http_conn
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else '')
+    conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    with _HTTP_LOCK:
+        for retry in (False, True):
+            conn = _http_conn
+            if conn is None or (conn.host, conn.port) != (parts.hostname, parts.port or conn_class.default_port):
+                if conn is not None:
+                    conn.close()
+                conn = _http_conn = conn_class(parts.hostname, parts.port, timeout=timeout)
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                _http_conn = None
+                if retry:
+                    raise
+                continue
+            if response.status != 200:
+                raise OSError(f"HTTP {response.status} {response.reason}")
+            return data
+
 # Traducciones por defecto (español) si no se puede descargar
 DEFAULT_TRANSLATIONS = {
     "es": {
@@ -40,39 +96,52 @@ DEFAULT_TRANSLATIONS = {
     }
 }
 
+def _intern_keys(translations: Dict) -> Dict:
+    """Interna las claves: las constantes de t('...') ya lo están, así la
+    búsqueda en el dict se resuelve por identidad sin comparar cadenas"""
+    return {sys.intern(key): value for key, value in translations.items()}
+
+# Las tablas por defecto se comparten entre instancias: solo lectura
+for _lang, _table in DEFAULT_TRANSLATIONS.items():
+    DEFAULT_TRANSLATIONS[_lang] = types.MappingProxyType(_intern_keys(_table))
+del _lang, _table
+
 class I18n:
     def __init__(self, language='es', github_repo=None):
         self.language = language
         self.github_repo = github_repo or GITHUB_REPO
         self.translations = {}
+        # Se llama (desde el hilo de descarga) cuando llega de GitHub el
+        # idioma activo; la bandeja rehace su menú, que no se repinta sola
+        self.on_update = None
         self._load_language(language)
     
     def _load_language(self, lang_code: str):
-        """Carga un idioma, primero desde cache, luego desde GitHub"""
+        """Carga un idioma desde memoria o cache; GitHub se consulta en segundo plano.
+
+        La descarga nunca bloquea: sin cache se usan al momento las
+        traducciones por defecto y el hilo de descarga las sustituye (y
+        guarda la cache) cuando termina.
+        """
+        translations = _LANG_CACHE.get(lang_code)
+        if translations is not None:
+            self.translations = translations
+            return
         # Intentar cargar desde cache
         cache_file = CACHE_DIR / f"{lang_code}.json"
         if cache_file.exists():
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    self.translations = json.load(f)
-                    return
+                self.translations = _LANG_CACHE[lang_code] = _intern_keys(_loads(cache_file.read_bytes()))
+                # Actualizar la cache para la próxima vez, sin esperar
+                self._fetch_in_background(lang_code)
+                return
             except Exception as e:
                 print(f"[I18N] Error leyendo cache de {lang_code}: {e}")
         
-        # Intentar descargar desde GitHub
-        try:
-            url = f"{self.github_repo}/{lang_code}.json"
-            with urllib.request.urlopen(url, timeout=5) as response:
-                data = response.read().decode('utf-8')
-                self.translations = json.loads(data)
-                # Guardar en cache
-                self._save_to_cache(lang_code, self.translations)
-                print(f"[I18N] Idioma {lang_code} descargado desde GitHub")
-                return
-        except Exception as e:
-            print(f"[I18N] No se pudo descargar {lang_code} desde GitHub: {e}")
+        # Descargar desde GitHub en segundo plano
+        self._fetch_in_background(lang_code)
         
-        # Fallback a traducciones por defecto
+        # Mientras tanto (o si falla), traducciones por defecto
         if lang_code in DEFAULT_TRANSLATIONS:
             self.translations = DEFAULT_TRANSLATIONS[lang_code]
             print(f"[I18N] Usando traducciones por defecto para {lang_code}")
@@ -81,13 +150,44 @@ class I18n:
             self.translations = DEFAULT_TRANSLATIONS['es']
             print(f"[I18N] Idioma {lang_code} no disponible, usando español")
     
+    def _fetch_in_background(self, lang_code: str):
+        """Lanza (una vez por idioma y proceso) la descarga desde GitHub"""
+        with _FETCHED_LOCK:
+            if lang_code in _FETCHED:
+                return
+            _FETCHED.add(lang_code)
+        threading.Thread(target=self._fetch_from_github, args=(lang_code,),
+                         name=f"i18n-{lang_code}", daemon=True).start()
+    
+    def _fetch_from_github(self, lang_code: str):
+        """Descarga un idioma, lo guarda en cache y lo aplica si sigue activo"""
+        try:
+            translations = _intern_keys(_loads(_http_get(f"{self.github_repo}/{lang_code}.json")))
+        except Exception as e:
+            print(f"[I18N] No se pudo descargar {lang_code} desde GitHub: {e}")
+            # Permitir reintentar en el próximo cambio de idioma
+            with _FETCHED_LOCK:
+                _FETCHED.discard(lang_code)
+            return
+        _LANG_CACHE[lang_code] = translations
+        self._save_to_cache(lang_code, translations)
+        print(f"[I18N] Idioma {lang_code} descargado desde GitHub")
+        if self.language != lang_code:
+            return
+        self.translations = translations
+        callback = self.on_update
+        if callback is not None:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[I18N] Error aplicando {lang_code}: {e}")
+    
     def _save_to_cache(self, lang_code: str, translations: Dict):
         """Guarda las traducciones en cache local"""
         try:
             CACHE_DIR.mkdir(parents=True, exist_ok=True)
             cache_file = CACHE_DIR / f"{lang_code}.json"
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(translations, f, ensure_ascii=False, indent=2)
+            cache_file.write_bytes(_dumps_pretty(translations))
         except Exception as e:
             print(f"[I18N] Error guardando cache: {e}")
     
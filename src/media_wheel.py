@@ -4,11 +4,17 @@ Intercepción de teclas multimedia (rueda del teclado) para tomar control total.
 - Volumen arriba/abajo: ajusta volumen de la sesión seleccionada (o master si no hay apps), o navega si está en modo selección.
 - Pulsar (mute): clic corto alterna modo volumen/selección; mantener 2s silencia la sesión actual (o master).
 - Se suprime el manejo nativo del sistema (no cambia el volumen maestro por defecto).
+
+Las teclas se registran con RegisterHotKey: Windows solo nos entrega
+VK_VOLUME_UP/DOWN/MUTE como WM_HOTKEY y no instala ningún hook global,
+así que el resto de pulsaciones no pasan por este proceso.
 """
 import sys
-import keyboard
+import ctypes
+from ctypes import wintypes
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Imports compatibles con PyInstaller
 if getattr(sys, 'frozen', False):
@@ -19,6 +25,23 @@ else:
     except ImportError:
         import backend
 
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+MOD_NOREPEAT = 0x4000
+VK_VOLUME_MUTE = 0xAD
+VK_VOLUME_DOWN = 0xAE
+VK_VOLUME_UP = 0xAF
+
+# id del hotkey -> (tecla virtual, modificadores, nombre del evento)
+# El mute no se repite al mantener pulsado: cada WM_HOTKEY es un clic
+MEDIA_HOTKEYS = {
+    1: (VK_VOLUME_UP, 0, 'volume up'),
+    2: (VK_VOLUME_DOWN, 0, 'volume down'),
+    3: (VK_VOLUME_MUTE, MOD_NOREPEAT, 'volume mute'),
+}
+# Signo del paso de volumen para las teclas arriba/abajo
+_DELTA_SIGN = {'volume up': 1, 'volume down': -1}
+
 
 class MediaWheelController:
     def __init__(self, step=4, hold_ms=2000):
@@ -28,11 +51,23 @@ class MediaWheelController:
         self.audio = backend.AudioManager()
         self.running = False
         self.refresh_thread = None
+        self.refresh_interval = 1  # segundos, solo si no hay eventos de sesión
+        # Lo activan los eventos de sesión de pycaw (y stop()) para refrescar ya
+        self._sessions_changed = threading.Event()
+        # Sin teclas multimedia en idle_after segundos la UI está oculta y
+        # nadie lee las sesiones: no se enumeran hasta la próxima pulsación
+        self.idle_after = 30
+        self.last_key_at = time.monotonic()
+        self._sessions_stale = False
+        self.hotkey_thread = None
+        self._mute_executor = None  # hilo para los SetMute, se crea al primer mute
+        self._hotkey_thread_id = None
         self.mute_click_count = 0  # Contador de clics para detectar doble clic
         self.last_mute_click_time = None  # Tiempo del último clic
         self.mute_double_click_threshold = 0.3  # segundos para considerar doble clic
-        self.last_master_volume = None
         self.ui_callback = None  # Callback para notificar a la UI
+        self.change_callback = None  # Callback: cambió lo que muestra la UI (repintar)
+        self._view_key = None  # huella de (nombre, volumen, mute) + selección
         # Guardas para evitar eventos solapados y rebotes
         self.guard_until = 0.0  # tiempo hasta el que se ignoran up/down tras cambiar modo
         self.event_cooldown = 0.06  # segundos de debounce entre deltas
@@ -51,19 +86,28 @@ class MediaWheelController:
         self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
         self.refresh_thread.start()
         
-        # Hook con keyboard library (como en Electron: suppress=True + return False)
-        keyboard.hook(self._handle_keyboard, suppress=True)
+        # Hotkeys globales solo para las teclas multimedia (las consume el sistema)
+        self.hotkey_thread = threading.Thread(target=self._hotkey_loop, daemon=True)
+        self.hotkey_thread.start()
         
         print("[MEDIA-WHEEL] Control de rueda multimedia activo (override nativo). Clic corto = alternar modo, doble clic = mute.")
 
     def stop(self):
         self.running = False
-        try:
-            keyboard.unhook_all()
-        except:
-            pass
+        self._sessions_changed.set()
+        if self._hotkey_thread_id:
+            try:
+                # Despierta GetMessageW para que el hilo desregistre y termine
+                ctypes.windll.user32.PostThreadMessageW(self._hotkey_thread_id, WM_QUIT, 0, 0)
+            except Exception:
+                pass
+        if self.hotkey_thread:
+            self.hotkey_thread.join(timeout=1)
         if self.refresh_thread:
             self.refresh_thread.join(timeout=1)
+        if self._mute_executor:
+            self.audio.mute_executor = None
+            self._mute_executor.shutdown(wait=False)
 
     def set_step(self, new_step):
         """Actualiza el tamaño del paso de volumen en tiempo de ejecución"""
@@ -72,63 +116,113 @@ class MediaWheelController:
             print(f"[MEDIA-WHEEL] Paso de volumen actualizado a {new_step}")
 
     def _refresh_loop(self):
-        while self.running:
+        """Refresca las sesiones cuando Windows avisa de un cambio.
+
+        Con eventos de sesión el hilo duerme hasta el aviso (y sondea cada
+        EVENT_FALLBACK_INTERVAL por si acaso); sin ellos, cada refresh_interval.
+        """
+        watcher = backend.SessionWatcher(self._sessions_changed.set)
+        interval = backend.EVENT_FALLBACK_INTERVAL if watcher.start() else self.refresh_interval
+        try:
+            while self.running:
+                if time.monotonic() - self.last_key_at < self.idle_after:
+                    try:
+                        self.audio.update_sessions()
+                        watcher.watch()
+                        self._sessions_stale = False
+                        self._notify_if_changed()
+                    except Exception as e:
+                        print(f"[MEDIA-WHEEL] Error refrescando sesiones: {e}")
+                else:
+                    # Inactivo: la próxima pulsación refresca antes de actuar
+                    self._sessions_stale = True
+                if self._sessions_changed.wait(interval):
+                    # Agrupar la ráfaga de eventos antes de volver a enumerar
+                    time.sleep(backend.EVENT_COALESCE_DELAY)
+                self._sessions_changed.clear()
+        finally:
+            watcher.stop()
+
+    def _hotkey_loop(self):
+        """Registra las teclas multimedia y atiende WM_HOTKEY en este hilo"""
+        user32 = ctypes.windll.user32
+        self._hotkey_thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        registered = []
+        for hotkey_id, (vk, mods, name) in MEDIA_HOTKEYS.items():
+            # hWnd=None: los mensajes llegan a la cola de este hilo
+            if user32.RegisterHotKey(None, hotkey_id, mods, vk):
+                registered.append(hotkey_id)
+            else:
+                print(f"[MEDIA-WHEEL] No se pudo registrar '{name}' (¿la usa otra aplicación?)")
+        try:
+            msg = wintypes.MSG()
+            while self.running and user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY and msg.wParam in MEDIA_HOTKEYS:
+                    try:
+                        self._handle_media_key(MEDIA_HOTKEYS[msg.wParam][2])
+                    except Exception as e:
+                        print(f"[MEDIA-WHEEL] Error procesando tecla: {e}")
+                    self._notify_if_changed()
+        finally:
+            for hotkey_id in registered:
+                user32.UnregisterHotKey(None, hotkey_id)
+            self._hotkey_thread_id = None
+
+    def _notify_if_changed(self):
+        """Avisa a la UI solo si cambió algo visible (sesiones, volumen, mute, icono o selección)"""
+        callback = self.change_callback
+        if callback is None:
+            return
+        audio = self.audio
+        key = hash((
+            # El icono cuenta: puede llegar después (se extrae en segundo plano)
+            tuple((s['name'], s['volume'], s.get('isMuted', False), s.get('icon')) for s in audio.sessions),
+            audio.selected_index,
+        ))
+        if key == self._view_key:
+            return
+        self._view_key = key
+        try:
+            callback()
+        except Exception:
+            pass
+
+    def _handle_media_key(self, name):
+        """Procesa una pulsación multimedia (el sistema ya no la ve)"""
+        # Un solo reloj por pulsación, monotónico (no salta con NTP ni con
+        # cambios de hora) para debounce, guardas y doble clic
+        now = self.last_key_at = time.monotonic()
+        if self._sessions_stale:
+            # Primera tecla tras un rato inactivo: lista de sesiones al día
+            self._sessions_stale = False
             try:
                 self.audio.update_sessions()
             except Exception as e:
                 print(f"[MEDIA-WHEEL] Error refrescando sesiones: {e}")
-            time.sleep(1)
-
-    def _handle_keyboard(self, event):
-        """Handler de teclado que suprime eventos multimedia (como Electron)"""
-        if event.event_type != 'down':
-            # Solo procesar key up para el botón mute
-            if event.name == 'volume mute' and event.event_type == 'up':
-                self._on_mute_click_internal()
-            return True
-        
-        # Verificar si es una tecla multimedia primero
-        if event.name not in ('volume up', 'volume down', 'volume mute'):
-            return True  # No es una tecla multimedia, permitir pasar sin mostrar UI
         
-        # Notificar a la UI para que se muestre (solo para teclas multimedia)
+        # Notificar a la UI para que se muestre
         if self.ui_callback:
             try:
                 self.ui_callback()
             except:
                 pass
         
-        # Guardar volumen maestro actual
-        self.last_master_volume = backend.get_master_volume()
+        if name == 'volume mute':
+            # Un WM_HOTKEY por pulsación: contar clics para detectar doble clic
+            self._on_mute_click_internal(now)
+            return
         
         # Debounce y guard tras cambios de modo
-        now = time.time()
-        if event.name in ('volume up', 'volume down'):
-            if self.ignore_deltas_count > 0:
-                self.ignore_deltas_count -= 1
-                return False
-            if now < self.guard_until:
-                return False
-            if (now - self.last_delta_at) < self.event_cooldown:
-                return False
-            self.last_delta_at = now
-
-        if event.name == 'volume up':
-            self._handle_volume_change(self.step)
-        elif event.name == 'volume down':
-            self._handle_volume_change(-self.step)
-        elif event.name == 'volume mute':
-            # Registrar clic para detectar doble clic (se procesa en key up)
-            pass
-        
-        # Restaurar volumen maestro después de un breve delay (como en Electron)
-        if self.last_master_volume is not None:
-            time.sleep(0.05)
-            current = backend.get_master_volume()
-            if current != self.last_master_volume:
-                backend.set_master_volume(self.last_master_volume)
-        
-        return False  # Suprimir evento nativo
+        if self.ignore_deltas_count > 0:
+            self.ignore_deltas_count -= 1
+            return
+        if now < self.guard_until:
+            return
+        if (now - self.last_delta_at) < self.event_cooldown:
+            return
+        self.last_delta_at = now
+
+        self._handle_volume_change(_DELTA_SIGN[name] * self.step)
 
     def _handle_volume_change(self, delta):
         if self.mode == 'select':
@@ -142,16 +236,14 @@ class MediaWheelController:
             else:
                 self._nudge_master(delta)
 
-    def _on_mute_click_internal(self):
+    def _on_mute_click_internal(self, now):
         """Maneja los clics en el botón mute para detectar doble clic"""
-        now = time.time()
-        
         # Si hace demasiado tiempo del último clic, resetear contador
         if self.last_mute_click_time is None or (now - self.last_mute_click_time) > self.mute_double_click_threshold:
             self.mute_click_count = 1
             self.last_mute_click_time = now
             # Un solo clic: alternar modo
-            self._toggle_mode()
+            self._toggle_mode(now)
         else:
             # Dentro del threshold: incrementar contador
             self.mute_click_count += 1
@@ -175,37 +267,46 @@ class MediaWheelController:
             return
         new_vol = max(0, min(100, current + delta))
         backend.set_master(new_vol)
-        print(f"[MEDIA-WHEEL] Master {new_vol}%")
+        if backend.VERBOSE:
+            print(f"[MEDIA-WHEEL] Master {new_vol}%")
 
-    def _toggle_mode(self):
+    def _toggle_mode(self, now):
         self.mode = 'select' if self.mode == 'volume' else 'volume'
-        print(f"[MEDIA-WHEEL] Modo: {'selección' if self.mode == 'select' else 'volumen directo'}")
+        if backend.VERBOSE:
+            print(f"[MEDIA-WHEEL] Modo: {'selección' if self.mode == 'select' else 'volumen directo'}")
         # Tras cambiar modo, ignorar up/down por un corto periodo para evitar solapes
-        self.guard_until = time.time() + 0.30
+        self.guard_until = now + 0.30
         # Reset del tiempo de último delta para cortar cadenas en curso
         self.last_delta_at = 0.0
         # Ignorar próximos 3 deltas de rueda para evitar cola de eventos
         self.ignore_deltas_count = 3
 
     def _mute_current(self):
-        session = self._current_session()
-        if session and session.get('_controls'):
-            # Toggle mute: si está muteada, desmutea; si no, mutea
-            target_mute = not session.get('isMuted', False)
-            for control in session['_controls']:
-                try:
-                    control.SetMute(target_mute, None)
-                except Exception:
-                    pass
-            session['isMuted'] = target_mute
-            print(f"[MEDIA-WHEEL] {session['name']} {'silenciada' if target_mute else 'activa'}")
-        else:
+        audio = self.audio
+        with audio.lock:
+            session = self._current_session()
+            if session and session.get('_controls'):
+                # Toggle mute: si está muteada, desmutea; si no, mutea
+                target_mute = not session.get('isMuted', False)
+                # Los SetMute van a otro hilo y el de las teclas queda libre;
+                # el desmuteo de change_volume usa el mismo, así no se adelanta
+                if self._mute_executor is None:
+                    self._mute_executor = audio.mute_executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix='audio-mute', initializer=backend._com_thread_init)
+                audio.set_mute(audio.selected_index, target_mute)
+            else:
+                session = None
+        if session is None:
             try:
                 backend.toggle_master_mute()
             except Exception:
                 pass
+        elif backend.VERBOSE:
+            print(f"[MEDIA-WHEEL] {session['name']} {'silenciada' if target_mute else 'activa'}")
 
     def _print_selection(self, state):
+        if not backend.VERBOSE:
+            return
         try:
             sel = state['sessions'][state['selectedIndex']]
             print(f"[MEDIA-WHEEL] Selección: {sel['name']}")
@@ -213,6 +314,8 @@ class MediaWheelController:
             pass
 
     def _print_volume(self, state):
+        if not backend.VERBOSE:
+            return
         try:
             sel = state['sessions'][state['selectedIndex']]
             print(f"[MEDIA-WHEEL] {sel['name']} → {sel['volume']}% ({self.mode})")
@@ -11,23 +11,23 @@ from __future__ import annotations
 import os
 import sys
 import time
-import json
-from pathlib import Path
-from typing import Optional, List, Tuple
+import base64
+import threading
+from typing import NamedTuple, Optional, List, Tuple
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
 # Imports compatibles con PyInstaller
 if getattr(sys, 'frozen', False):
-    import backend
     import i18n
+    from config import load_config, save_config
 else:
     try:
-        from . import backend
         from . import i18n
+        from .config import load_config, save_config
     except ImportError:
-        import backend
         import i18n
+        from config import load_config, save_config
 
 DARK_BG = QtGui.QColor("#1A1A1B")
 DARK_CARD = QtGui.QColor("#1E1E20")
@@ -35,39 +35,151 @@ BORDER = QtGui.QColor("#2D2D2F")
 WHITE = QtGui.QColor("#FFFFFF")
 GREY = QtGui.QColor("#6E6E73")
 
-CONFIG_DIR = Path.home() / 'AppData' / 'Local' / 'SoundBoard Manager'
-CONFIG_FILE = CONFIG_DIR / 'settings.json'
-DEFAULT_CONFIG = {
-    'position': 'top-left',  # 9 positions
-    'offset_x': 10,
-    'offset_y': 10,
-    'language': 'es',  # default Spanish
-    'step': 4  # Tamano del paso de volumen (2-10)
+# Geometría del overlay: cabecera (logo + título) y tarjetas de sesión
+HEADER_H = 61  # las tarjetas empiezan bajo el título
+CARD_H = 64
+CARD_GAP = 10
+OVERLAY_W, OVERLAY_H = 420, 520
+ICON_PIXMAP_CACHE_MAX = 64  # iconos decodificados que se guardan
+STATIC_TEXT_CACHE_MAX = 128  # nombres maquetados que se guardan
+VOL_TEXTS = tuple(f"{i}%" for i in range(101))  # "0%".."100%" (vol ya acotado)
+OVERLAY_TEXT_KEYS = ('mixer_title', 'no_apps')  # textos fijos que pinta el overlay
+BAR_FILL_CACHE_MAX = 128  # rellenos de barra (uno por ancho) guardados
+
+def _enable_gpu_backing_store() -> None:
+    """Composición de las ventanas de widgets por GPU (RHI), opcional.
+
+    Con SBM_GPU=1 el backing store del overlay se vuelca por Direct3D en vez
+    de por GDI. Por defecto se deja el raster por software: el overlay es una
+    ventana layered translúcida que solo repinta trozos pequeños y no todos
+    los drivers la componen bien por RHI. Debe llamarse antes de crear la
+    QApplication.
+    """
+    if os.getenv('SBM_GPU') != '1':
+        return
+    os.environ.setdefault('QT_WIDGETS_RHI', '1')
+    # Canal alfa en la superficie: sin él el fondo translúcido sale negro
+    fmt = QtGui.QSurfaceFormat()
+    fmt.setAlphaBufferSize(8)
+    # Sin esperar al vsync en cada volcado: el fundido y los cambios de
+    # volumen no se quedan esperando un refresco de pantalla
+    fmt.setSwapInterval(0)
+    QtGui.QSurfaceFormat.setDefaultFormat(fmt)
+
+# Posiciones de la config -> anclaje (x, y): 0 = offset desde el borde
+# izquierdo/superior, 1 = centrado, 2 = offset desde el borde derecho/inferior
+_POSITION_ANCHORS = {
+    'top-left': (0, 0), 'top-center': (1, 0), 'top-right': (2, 0),
+    'middle-left': (0, 1), 'center': (1, 1), 'middle-right': (2, 1),
+    'bottom-left': (0, 2), 'bottom-center': (1, 2), 'bottom-right': (2, 2),
 }
 
-def load_config():
-    try:
-        if CONFIG_FILE.exists():
-            with open(CONFIG_FILE, 'r') as f:
-                return {**DEFAULT_CONFIG, **json.load(f)}
-    except Exception:
-        pass
-    return DEFAULT_CONFIG.copy()
-
-def save_config(config):
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"[CONFIG] Error saving: {e}")
-        return False
+def _anchored(anchor: int, screen: int, size: int, offset: int) -> int:
+    """Coordenada en un eje según el anclaje de _POSITION_ANCHORS.
+
+    0 -> offset, 1 -> (screen - size) // 2, 2 -> screen - size - offset
+    """
+    return (screen - size) * anchor // 2 + offset * (1 - anchor)
+
+def _paint_logo(p: QtGui.QPainter) -> None:
+    """Logo 32x32: círculo blanco con speaker"""
+    p.setBrush(WHITE)
+    p.setPen(QtCore.Qt.NoPen)
+    # Círculo blanco
+    p.drawEllipse(QtCore.QRect(0, 0, 32, 32))
+    # Símbolo de altavoz (rectángulo + triángulo)
+    p.setBrush(QtGui.QColor("#1A1A1B"))
+    cx, cy = 15, 15  # QRect(0, 0, 32, 32).center()
+    # Rectángulo base del speaker
+    p.drawRect(cx-8, cy-4, 5, 8)
+    # Triángulo usando path
+    path = QtGui.QPainterPath()
+    path.moveTo(cx-3, cy-6)
+    path.lineTo(cx+4, cy-10)
+    path.lineTo(cx+4, cy+10)
+    path.lineTo(cx-3, cy+6)
+    path.closeSubpath()
+    p.drawPath(path)
+    # Ondas de sonido
+    p.setPen(QtGui.QPen(QtGui.QColor("#1A1A1B"), 2))
+    p.setBrush(QtCore.Qt.NoBrush)
+    p.drawArc(cx+5, cy-6, 6, 12, 300*16, 120*16)
+
+def _paint_mute(p: QtGui.QPainter) -> None:
+    """Icono de mute 20x20: speaker con X roja"""
+    # Speaker
+    p.setBrush(WHITE)
+    p.setPen(QtCore.Qt.NoPen)
+    p.drawRect(0, 6, 4, 8)
+    mpath = QtGui.QPainterPath()
+    mpath.moveTo(4, 6)
+    mpath.lineTo(10, 2)
+    mpath.lineTo(10, 18)
+    mpath.lineTo(4, 14)
+    mpath.closeSubpath()
+    p.drawPath(mpath)
+    # X roja
+    p.setPen(QtGui.QPen(QtGui.QColor("#FF4444"), 2))
+    p.drawLine(12, 4, 18, 16)
+    p.drawLine(12, 16, 18, 4)
+
+_GLYPH_SIZES = {'logo': 32, 'mute': 20}
+_GLYPH_PAINTERS = {'logo': _paint_logo, 'mute': _paint_mute}
+
+def _icon_bytes(icon_data: str) -> Tuple[bytes, Optional[str]]:
+    """Bytes de imagen de un icono base64 y su formato si lo dice el data URI.
+
+    'data:image/png;base64,...' -> (bytes, 'PNG'); sin prefijo, formato None
+    y Qt lo averigua por el contenido.
+    """
+    fmt = None
+    if icon_data.startswith('data:image/'):
+        header, _, icon_data = icon_data.partition(',')
+        fmt = header[11:].partition(';')[0].upper() or None
+    return base64.b64decode(icon_data), fmt
+
+class SessionSnap(NamedTuple):
+    """Lo que pinta una tarjeta, leído de la sesión una vez por cambio"""
+    name: str
+    vol: int
+    muted: bool
+    selected: bool
+    icon: Optional[str]
+
+def build_snapshot(audio) -> Tuple[SessionSnap, ...]:
+    """Foto inmutable de las sesiones de audio, lista para pintar"""
+    selected_idx = int(audio.selected_index)
+    snap = []
+    for i, s in enumerate(audio.sessions):
+        icon = s.get('icon')
+        vol = int(s.get('volume', 0))
+        snap.append(SessionSnap(
+            str(s.get('name', '')),
+            # Acotado aquí una vez: paintEvent lo usa tal cual
+            0 if vol < 0 else 100 if vol > 100 else vol,
+            bool(s.get('isMuted', False)),
+            i == selected_idx,
+            # paintEvent solo ve una cadena base64 o None
+            icon if isinstance(icon, str) else None,
+        ))
+    return tuple(snap)
+
+class CardGeom(NamedTuple):
+    """Rectángulos fijos de una tarjeta (solo dependen del tamaño de la ventana)"""
+    card: QtCore.QRect
+    dirty: QtCore.QRect
+    inner: QtCore.QRect
+    bar: QtCore.QRect
+    level: QtGui.QRegion
+    origin: QtCore.QPoint
 
 class QtOverlay(QtWidgets.QWidget):
     requestShow = QtCore.Signal()
     requestHide = QtCore.Signal()
     requestSettings = QtCore.Signal()
+    settingsSaved = QtCore.Signal()
+    # Foto nueva de las sesiones (tuple de SessionSnap), ver publish_snapshot
+    sessionsChanged = QtCore.Signal(object)
     
     def __init__(self, controller=None, parent=None):
         super().__init__(parent)
@@ -93,18 +205,63 @@ class QtOverlay(QtWidgets.QWidget):
         except Exception:
             pass
 
-        # Geometría y opacidad
+        # Geometría y opacidad. El tamaño de pantalla se guarda y solo se
+        # vuelve a leer cuando Qt avisa de que cambió (resolución, escala)
+        screen = QtWidgets.QApplication.primaryScreen()
+        self._screen_size = screen.geometry().size()
+        screen.geometryChanged.connect(self._on_screen_geometry)
         self._apply_position_from_config()
         self.setWindowOpacity(0.0)
 
-        # Datos de UI
-        self._last_sessions: List[Tuple[str,int,bool]] = []
-
-        # Timer de refresco
+        # Datos de UI: foto inmutable de las sesiones, tomada en el hilo del
+        # controlador. paintEvent pinta esta foto (sin tocar el estado de
+        # audio ni convertir nada) y compararla con la anterior permite
+        # repintar solo las tarjetas que cambian
+        self._snap: Tuple[SessionSnap, ...] = ()
+        self._snap_lock = threading.Lock()
+        # Diálogo de configuración, creado en el primer uso
+        self._settings_dialog: Optional[SettingsDialog] = None
+        # Geometría por índice de tarjeta; se rehace al cambiar de tamaño
+        self._geoms: List[CardGeom] = []
+        # Fondo de tarjeta + pista de la barra ya pintados: (seleccionada, dpr)
+        self._card_bgs = {}
+        # Relleno de la barra de volumen ya pintado: (ancho, dpr) -> QPixmap
+        self._bar_fills = {}
+        # Glifos estáticos ya pintados: (nombre, devicePixelRatio) -> QPixmap
+        self._glyphs = {}
+        # Iconos de aplicación ya decodificados: (base64, dpr) -> QPixmap o None
+        self._icon_pixmaps = {}
+
+        # Textos fijos traducidos y la tabla de i18n de la que salieron
+        self._tr_table = None
+        self._tr = {}
+        # Textos ya maquetados: (nombre, ancho) -> QStaticText, volumen -> "NN%"
+        self._name_static = {}
+        self._vol_static = {}
+
+        # Fuentes, plumas y pinceles de paintEvent: se crean una vez
+        self._font_title = QtGui.QFont("Segoe UI", 18, QtGui.QFont.Bold)
+        self._font_name = QtGui.QFont("Segoe UI", 13, QtGui.QFont.Bold)
+        self._font_vol = QtGui.QFont("Segoe UI", 15, QtGui.QFont.Bold)
+        self._font_empty = QtGui.QFont("Segoe UI", 13)
+        self._name_metrics = QtGui.QFontMetricsF(self._font_name)
+        self._pen_selected = QtGui.QPen(WHITE, 2)
+        self._pen_border = QtGui.QPen(BORDER, 1)
+        self._brush_card_sel = QtGui.QBrush(DARK_CARD)
+        self._brush_card_bg = QtGui.QBrush(DARK_BG)
+        self._brush_bar_bg = QtGui.QBrush(BORDER)
+        self._brush_bar = QtGui.QBrush(WHITE)
+
+        # Repintado por eventos (sessionsChanged); este timer lento solo es
+        # una red de seguridad y solo corre mientras la ventana está visible
         self._refresh = QtCore.QTimer(self)
-        self._refresh.setInterval(50)
-        self._refresh.timeout.connect(self.update)
-        self._refresh.start()
+        self._refresh.setInterval(500)
+        self._refresh.timeout.connect(self.publish_snapshot)
+
+        # Hay un requestShow de request_show pendiente en la cola de eventos
+        self._show_queued = False
+        # paintEvent se saltó por opacidad 0 (ver paintEvent/_fade_to)
+        self._paint_skipped = False
 
         # Auto-ocultar
         self._autohide_timer = QtCore.QTimer(self)
@@ -115,40 +272,277 @@ class QtOverlay(QtWidgets.QWidget):
         self._anim = QtCore.QPropertyAnimation(self, b"windowOpacity", self)
         self._anim.setDuration(200)
         self._anim.setEasingCurve(QtCore.QEasingCurve.OutCubic)
+        # Una sola conexión para toda la vida del overlay (ver _on_anim_done)
+        self._anim.finished.connect(self._on_anim_done)
 
-        # Asegurar estilos de ventana en Win32 para passthrough (redundante a Qt pero robusto)
-        self._apply_click_through_win32()
+        # Estilos Win32 de passthrough (redundante a Qt pero robusto): una
+        # sola vez, tras el primer show, cuando Qt ya ha fijado los suyos
+        self._ct_applied = False
 
         # Conexiones thread-safe
         self.requestShow.connect(self.show_with_fade)
         self.requestHide.connect(self.hide_with_fade)
         self.requestSettings.connect(self._show_settings_safe)
+        self.sessionsChanged.connect(self._on_sessions_changed)
+        self.publish_snapshot()
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self._refresh.start()
+        if not self._ct_applied:
+            self._ct_applied = True
+            QtCore.QTimer.singleShot(0, self._apply_click_through_win32)
+        super().showEvent(event)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self._refresh.stop()
+        super().hideEvent(event)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        self._geoms = []
+        self._card_bgs = {}
+        self._bar_fills = {}
+        super().resizeEvent(event)
+
+    def _glyph(self, name: str) -> QtGui.QPixmap:
+        """Logo o icono de mute pre-renderizado (una vez por escala de pantalla)"""
+        dpr = self.devicePixelRatioF()
+        key = (name, dpr)
+        pixmap = self._glyphs.get(key)
+        if pixmap is None:
+            size = _GLYPH_SIZES[name]
+            pixmap = QtGui.QPixmap(round(size * dpr), round(size * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(QtCore.Qt.transparent)
+            p = QtGui.QPainter(pixmap)
+            try:
+                p.setRenderHint(QtGui.QPainter.Antialiasing, True)
+                _GLYPH_PAINTERS[name](p)
+            finally:
+                p.end()
+            self._glyphs[key] = pixmap
+        return pixmap
+
+    def _icon_pixmap(self, icon_data, size: int) -> Optional[QtGui.QPixmap]:
+        """QPixmap escalado de un icono base64, decodificado una sola vez.
+
+        La clave es la propia cadena (backend reutiliza el mismo objeto por
+        aplicación, así que su hash ya está calculado) y la escala de pantalla.
+        """
+        if not icon_data:
+            return None
+        dpr = self.devicePixelRatioF()
+        key = (icon_data, dpr)
+        try:
+            return self._icon_pixmaps[key]
+        except KeyError:
+            pass
+        pixmap = None
+        try:
+            data, fmt = _icon_bytes(icon_data)
+            loaded = QtGui.QPixmap()
+            # Con el formato del data URI Qt no prueba cada lector de imagen;
+            # si no lo reconoce, se deja que lo averigüe por el contenido
+            ok = bool(fmt) and loaded.loadFromData(data, fmt)
+            if not ok:
+                ok = loaded.loadFromData(data)
+            if ok:
+                pixmap = loaded.scaled(round(size * dpr), round(size * dpr), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+                pixmap.setDevicePixelRatio(dpr)
+        except Exception:
+            pixmap = None
+        if len(self._icon_pixmaps) >= ICON_PIXMAP_CACHE_MAX:
+            self._icon_pixmaps.clear()
+        # También se recuerdan los fallos: no reintentar en cada repintado
+        self._icon_pixmaps[key] = pixmap
+        return pixmap
+
+    def _texts(self) -> dict:
+        """Textos fijos del overlay en el idioma actual.
+
+        Se rehacen solo cuando i18n cambia de tabla (cambio de idioma o
+        descarga terminada en segundo plano); si no, es una comparación.
+        """
+        table = self.i18n.translations
+        if table is not self._tr_table:
+            self._tr = {key: self.i18n.t(key) for key in OVERLAY_TEXT_KEYS}
+            self._tr_table = table
+        return self._tr
+
+    @staticmethod
+    def _static_text(cache: dict, key, text: str, font: QtGui.QFont) -> Tuple[QtGui.QStaticText, int, int]:
+        """QStaticText ya maquetado (shaping hecho) para text con font.
+
+        Devuelve también su ancho y su desplazamiento vertical para quedar
+        centrado en la franja de 22 px, en enteros: paintEvent no crea
+        QSizeF/QPointF por tarjeta.
+        """
+        entry = cache.get(key)
+        if entry is None:
+            if len(cache) >= STATIC_TEXT_CACHE_MAX:
+                cache.clear()
+            static = QtGui.QStaticText(text)
+            static.setTextFormat(QtCore.Qt.PlainText)
+            static.prepare(QtGui.QTransform(), font)
+            size = static.size()
+            entry = cache[key] = (static, round(size.width()), round((22 - size.height()) / 2))
+        return entry
+
+    def _bar_fill(self, w: int, h: int) -> QtGui.QPixmap:
+        """Relleno redondeado de la barra de volumen, de ancho w, ya pintado.
+
+        Con el volumen acotado a 0..100 hay como mucho 101 anchos por tamaño
+        de barra: cada relleno se rasteriza una vez y después es un blit.
+        """
+        dpr = self.devicePixelRatioF()
+        key = (w, dpr)
+        pixmap = self._bar_fills.get(key)
+        if pixmap is None:
+            if len(self._bar_fills) >= BAR_FILL_CACHE_MAX:
+                self._bar_fills.clear()
+            pixmap = QtGui.QPixmap(round(w * dpr), round(h * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(QtCore.Qt.transparent)
+            p = QtGui.QPainter(pixmap)
+            try:
+                p.setRenderHint(QtGui.QPainter.Antialiasing, True)
+                p.setPen(QtCore.Qt.NoPen)
+                p.setBrush(self._brush_bar)
+                p.drawRoundedRect(QtCore.QRect(0, 0, w, h), 5, 5)
+            finally:
+                p.end()
+            self._bar_fills[key] = pixmap
+        return pixmap
+
+    def _name_text(self, name: str, width: int) -> Tuple[QtGui.QStaticText, int, int]:
+        """Nombre recortado con "…" a width px y ya maquetado (una vez por par)"""
+        key = (name, width)
+        entry = self._name_static.get(key)
+        if entry is None:
+            elided = self._name_metrics.elidedText(name, QtCore.Qt.ElideRight, width)
+            entry = self._static_text(self._name_static, key, elided, self._font_name)
+        return entry
+
+    def _card_geom(self, i: int) -> CardGeom:
+        """Geometría de la tarjeta i, calculada una vez por tamaño de ventana"""
+        geoms = self._geoms
+        while len(geoms) <= i:
+            panel = self.rect()
+            left = panel.left() + 15
+            right = panel.right() - 15
+            card = QtCore.QRect(left, panel.top() + HEADER_H + len(geoms) * (CARD_H + CARD_GAP), right-left, CARD_H)
+            # +1 px: el borde de 2 px de la seleccionada sobresale
+            dirty = card.adjusted(-1, -1, 1, 1)
+            inner = card.adjusted(14, 10, -14, -10)
+            bar = QtCore.QRect(inner.left(), inner.bottom()-14, inner.width(), 10)
+            # Lo que cambia con el volumen o el mute: el "NN%" (o el icono de
+            # mute) alineado a la derecha y la barra, con 1 px de antialiasing
+            level = QtGui.QRegion(QtCore.QRect(inner.right() - 99, inner.top(), 100, 22))
+            level = level.united(bar.adjusted(-1, -1, 1, 1))
+            geoms.append(CardGeom(
+                card,
+                dirty,
+                inner,
+                bar,
+                level,
+                # Esquina donde va el fondo pre-renderizado (_card_bg)
+                dirty.topLeft(),
+            ))
+        return geoms[i]
+
+    def publish_snapshot(self):
+        """Toma la foto de las sesiones en el hilo que llama y la envía a la UI.
+
+        Lo llama el controlador desde su hilo justo tras cambiar el estado.
+        El lock mantiene el orden de las fotos si avisan dos hilos a la vez.
+        """
+        with self._snap_lock:
+            try:
+                snap = build_snapshot(self.controller.audio)
+            except Exception:
+                snap = ()
+            self.sessionsChanged.emit(snap)
+
+    def _on_sessions_changed(self, view: Tuple[SessionSnap, ...]):
+        """Guarda la foto nueva y repinta solo las tarjetas que cambian"""
+        last = self._snap
+        self._snap = view
+        if len(view) != len(last) or not view:
+            # Altas/bajas (o el aviso de "sin aplicaciones"): todo
+            self.update()
+            return
+        for i, (old, new) in enumerate(zip(last, view)):
+            if old == new:
+                continue
+            if old.name == new.name and old.icon == new.icon and old.selected == new.selected:
+                # Solo volumen/mute (lo habitual al girar la rueda)
+                self.update(self._card_geom(i).level)
+            else:
+                self.update(self._card_geom(i).dirty)
+
+    def _fade_to(self, opacity: float) -> None:
+        """Anima windowOpacity hasta opacity, salvo que ya esté ahí o yendo"""
+        anim = self._anim
+        if anim.state() == QtCore.QAbstractAnimation.Running:
+            if anim.endValue() == opacity:
+                return
+        elif abs(self.windowOpacity() - opacity) < 0.01:
+            # Qt guarda la opacidad en 8 bits: 0.95 se lee como 242/255
+            return
+        anim.stop()
+        if opacity > 0 and self._paint_skipped:
+            # paintEvent se saltó con la ventana transparente: repintar todo
+            # antes de que el fundido la haga visible
+            self._paint_skipped = False
+            self.update()
+        anim.setStartValue(self.windowOpacity())
+        anim.setEndValue(opacity)
+        anim.start()
+
+    def request_show(self):
+        """Pide mostrar el overlay desde cualquier hilo (rueda multimedia).
+
+        Mientras haya una petición en la cola de eventos de Qt las demás se
+        descartan: una ráfaga de pasos de rueda produce un solo show_with_fade
+        por vuelta del bucle, sin añadir retardo a la primera.
+        """
+        if self._show_queued:
+            return
+        self._show_queued = True
+        self.requestShow.emit()
 
     def show_with_fade(self):
+        self._show_queued = False
         if not self.isVisible():
             self.show()
-        self._anim.stop()
-        self._anim.setStartValue(self.windowOpacity())
-        self._anim.setEndValue(0.95)
-        self._anim.start()
+        # Cada paso de la rueda llega aquí: con el overlay ya visible solo se
+        # reinicia el auto-ocultado, sin relanzar una animación de 0.95 a 0.95
+        self._fade_to(0.95)
         self._autohide_timer.start(3000)
+        # Vuelve a mostrarse a mitad de un fundido de salida
+        if not self._refresh.isActive():
+            self._refresh.start()
 
     def hide_with_fade(self):
-        self._anim.stop()
-        self._anim.setStartValue(self.windowOpacity())
-        self._anim.setEndValue(0.0)
-        self._anim.finished.connect(self._on_faded_out)
-        self._anim.start()
-
-    def _on_faded_out(self):
-        if self.windowOpacity() <= 0.01:
+        self._autohide_timer.stop()
+        # Durante el fundido de salida no hace falta la red de seguridad
+        self._refresh.stop()
+        self._fade_to(0.0)
+
+    def _on_anim_done(self):
+        """Al terminar un fundido de salida se oculta la ventana.
+
+        finished solo llega si la animación acabó (no tras stop()), así que
+        su valor final dice qué fundido era sin releer windowOpacity.
+        """
+        if self._anim.endValue() == 0.0:
             self.hide()
-        try:
-            self._anim.finished.disconnect(self._on_faded_out)
-        except Exception:
-            pass
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        if self.windowOpacity() < 0.02 and self._anim.state() != QtCore.QAbstractAnimation.Running:
+            # Invisible y sin fundido en marcha (expose del compositor, etc.):
+            # no se pinta; _fade_to repinta antes de volver a mostrarse
+            self._paint_skipped = True
+            return
         p = QtGui.QPainter(self)
         try:
             p.setRenderHint(QtGui.QPainter.Antialiasing, True)
@@ -156,38 +550,20 @@ class QtOverlay(QtWidgets.QWidget):
             # Panel base (sin fondo, solo transparente)
             rect = self.rect()
             panel = rect.adjusted(0, 0, 0, 0)
+            # Solo se dibuja lo que toca la región sucia (Qt ya recorta y
+            # limpia el resto); una barra de volumen no repinta la cabecera
+            dirty = event.region()
+            header_dirty = dirty.intersects(QtCore.QRect(panel.left(), panel.top(), panel.width(), HEADER_H))
 
             # Logo/Icono a la izquierda del título (círculo blanco con speaker)
-            logo_size = 32
-            logo_rect = QtCore.QRect(panel.left()+15, panel.top()+14, logo_size, logo_size)
-            p.setBrush(WHITE)
-            p.setPen(QtCore.Qt.NoPen)
-            # Círculo blanco
-            p.drawEllipse(logo_rect)
-            # Símbolo de altavoz (rectángulo + triángulo)
-            p.setBrush(QtGui.QColor("#1A1A1B"))
-            cx, cy = logo_rect.center().x(), logo_rect.center().y()
-            # Rectángulo base del speaker
-            p.drawRect(cx-8, cy-4, 5, 8)
-            # Triángulo usando path
-            path = QtGui.QPainterPath()
-            path.moveTo(cx-3, cy-6)
-            path.lineTo(cx+4, cy-10)
-            path.lineTo(cx+4, cy+10)
-            path.lineTo(cx-3, cy+6)
-            path.closeSubpath()
-            p.drawPath(path)
-            # Ondas de sonido
-            p.setPen(QtGui.QPen(QtGui.QColor("#1A1A1B"), 2))
-            p.setBrush(QtCore.Qt.NoBrush)
-            p.drawArc(cx+5, cy-6, 6, 12, 300*16, 120*16)
-
-            # Título (desplazado para dejar espacio al logo)
-            title_rect = QtCore.QRect(panel.left()+55, panel.top()+18, panel.width()-100, 30)
-            p.setPen(WHITE)
-            title_font = QtGui.QFont("Segoe UI", 18, QtGui.QFont.Bold)
-            p.setFont(title_font)
-            p.drawText(title_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter, self.i18n.t('mixer_title'))
+            if header_dirty:
+                p.drawPixmap(panel.left()+15, panel.top()+14, self._glyph('logo'))
+
+                # Título (desplazado para dejar espacio al logo)
+                title_rect = QtCore.QRect(panel.left()+55, panel.top()+18, panel.width()-100, 30)
+                p.setPen(WHITE)
+                p.setFont(self._font_title)
+                p.drawText(title_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter, self._texts()['mixer_title'])
 
             # Modo
             # mode_text = ""
@@ -200,172 +576,127 @@ class QtOverlay(QtWidgets.QWidget):
             # p.setFont(small_font)
             # p.drawText(mode_rect, QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter, mode_text)
 
-            # Sesiones
-            sessions = []
-            selected_idx = -1
-            try:
-                if self.controller and hasattr(self.controller, 'audio'):
-                    sessions = list(self.controller.audio.sessions)
-                    selected_idx = int(self.controller.audio.selected_index)
-            except Exception:
-                sessions = []
-
-            y = title_rect.bottom() + 14
-            item_h = 64
-            left = panel.left() + 15
-            right = panel.right() - 15
+            # Sesiones (foto de publish_snapshot): solo las tarjetas que
+            # toca la región sucia
+            sessions = self._snap
+            cards = []
             for i, s in enumerate(sessions):
-                name = str(s.get('name', ''))
-                vol = int(s.get('volume', 0))
-                is_sel = (i == selected_idx)
-
-                # Card
-                card_rect = QtCore.QRect(left, y, right-left, item_h)
-                p.setBrush(DARK_CARD if is_sel else DARK_BG)
-                pen = QtGui.QPen(WHITE if is_sel else BORDER)
-                pen.setWidth(2 if is_sel else 1)
-                p.setPen(pen)
-                p.drawRoundedRect(card_rect, 10, 10)
-
-                inner = card_rect.adjusted(14, 10, -14, -10)
-
-                # Icono de la aplicación a la izquierda
-                icon_size = 24
-                icon_x = inner.left()
-                icon_y = inner.top()
-                icon_drawn = False
-                try:
-                    icon_data = s.get('icon')
-                    # Si no hay icono en datos, intentar obtenerlo del proceso
-                    if not icon_data:
-                        try:
-                            pid = s.get('pid')
-                            if pid:
-                                icon_data = backend.get_app_icon_base64(pid)
-                        except Exception:
-                            pass
-                    
-                    if icon_data:
-                        # Convertir base64 a QPixmap
-                        import base64
-                        if isinstance(icon_data, str):
-                            if icon_data.startswith('data:image/'):
-                                b64_str = icon_data.split(',')[1]
-                            else:
-                                b64_str = icon_data
-                            img_bytes = base64.b64decode(b64_str)
-                            pixmap = QtGui.QPixmap()
-                            if pixmap.loadFromData(img_bytes):
-                                # Escalar a 24x24
-                                pixmap = pixmap.scaled(icon_size, icon_size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-                                p.drawPixmap(icon_x, icon_y, pixmap)
-                                icon_drawn = True
-                except Exception:
-                    pass
-
-                # Nombre (desplazado si hay icono)
-                text_left = icon_x + (icon_size + 8 if icon_drawn else 0)
-                p.setPen(WHITE)
-                p.setFont(QtGui.QFont("Segoe UI", 13, QtGui.QFont.Bold))
-                p.drawText(QtCore.QRect(text_left, inner.top(), inner.width()-60-(text_left-inner.left()), 22),
-                           QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft, name)
-
-                # Porcentaje o icono de mute
-                is_muted = s.get('isMuted', False)
-                if is_muted:
-                    # Dibujar icono de mute (speaker con X)
-                    mute_x = inner.right() - 50
-                    mute_y = inner.top()
-                    mute_size = 20
-                    # Speaker
-                    p.setBrush(WHITE)
-                    p.setPen(QtCore.Qt.NoPen)
-                    p.drawRect(mute_x, mute_y+6, 4, 8)
-                    mpath = QtGui.QPainterPath()
-                    mpath.moveTo(mute_x+4, mute_y+6)
-                    mpath.lineTo(mute_x+10, mute_y+2)
-                    mpath.lineTo(mute_x+10, mute_y+18)
-                    mpath.lineTo(mute_x+4, mute_y+14)
-                    mpath.closeSubpath()
-                    p.drawPath(mpath)
-                    # X roja
-                    p.setPen(QtGui.QPen(QtGui.QColor("#FF4444"), 2))
-                    p.drawLine(mute_x+12, mute_y+4, mute_x+18, mute_y+16)
-                    p.drawLine(mute_x+12, mute_y+16, mute_x+18, mute_y+4)
-                else:
-                    p.setPen(WHITE)
-                    p.setFont(QtGui.QFont("Segoe UI", 15, QtGui.QFont.Bold))
-                    p.drawText(QtCore.QRect(inner.right()-60, inner.top(), 60, 22),
-                               QtCore.Qt.AlignVCenter | QtCore.Qt.AlignRight, f"{vol}%")
-
-                # Barra de volumen
-                bar_rect = QtCore.QRect(inner.left(), inner.bottom()-14, inner.width(), 10)
-                # Fondo
-                p.setPen(QtCore.Qt.NoPen)
-                p.setBrush(QtGui.QColor("#2D2D2F"))
-                p.drawRoundedRect(bar_rect, 5, 5)
-                # Progreso
-                prog_w = int(bar_rect.width() * max(0, min(100, vol))/100)
-                prog_rect = QtCore.QRect(bar_rect.left(), bar_rect.top(), prog_w, bar_rect.height())
-                p.setBrush(WHITE)
-                p.drawRoundedRect(prog_rect, 5, 5)
-
-                y += item_h + 10
+                geom = self._card_geom(i)
+                if dirty.intersects(geom.dirty):
+                    cards.append((geom, s))
+            if cards:
+                self._paint_cards(p, cards)
 
             if not sessions:
                 p.setPen(GREY)
-                p.setFont(QtGui.QFont("Segoe UI", 13))
-                p.drawText(panel, QtCore.Qt.AlignCenter, self.i18n.t('no_apps'))
+                p.setFont(self._font_empty)
+                p.drawText(panel, QtCore.Qt.AlignCenter, self._texts()['no_apps'])
         finally:
             try:
                 p.end()
             except Exception:
                 pass
 
+    def _card_bg(self, geom: CardGeom, selected: bool) -> QtGui.QPixmap:
+        """Fondo, borde y pista de la barra de una tarjeta en un solo QPixmap.
+
+        Todas las tarjetas miden lo mismo, así que basta uno por estado de
+        selección; cada tarjeta queda en un drawPixmap en vez de dos
+        rectángulos redondeados con antialiasing.
+        """
+        dpr = self.devicePixelRatioF()
+        key = (selected, dpr)
+        pixmap = self._card_bgs.get(key)
+        if pixmap is None:
+            area = geom.dirty
+            pixmap = QtGui.QPixmap(round(area.width() * dpr), round(area.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(QtCore.Qt.transparent)
+            p = QtGui.QPainter(pixmap)
+            try:
+                p.setRenderHint(QtGui.QPainter.Antialiasing, True)
+                p.translate(-area.left(), -area.top())
+                p.setBrush(self._brush_card_sel if selected else self._brush_card_bg)
+                p.setPen(self._pen_selected if selected else self._pen_border)
+                p.drawRoundedRect(geom.card, 10, 10)
+                p.setPen(QtCore.Qt.NoPen)
+                p.setBrush(self._brush_bar_bg)
+                p.drawRoundedRect(geom.bar, 5, 5)
+            finally:
+                p.end()
+            self._card_bgs[key] = pixmap
+        return pixmap
+
+    def _paint_cards(self, p: QtGui.QPainter, cards: List[Tuple[CardGeom, SessionSnap]]) -> None:
+        """Dibuja las tarjetas en tres pasadas agrupadas por estado del pintor.
+
+        Primero todos los blits (fondo, icono, relleno de barra), luego todos
+        los nombres y al final todos los volúmenes: pluma y fuente se fijan
+        una vez por pasada y no dos o tres veces por tarjeta.
+        """
+        # Fondos con pista, iconos y rellenos: solo pixmaps cacheados
+        name_lefts = []
+        for geom, s in cards:
+            p.drawPixmap(geom.origin, self._card_bg(geom, s.selected))
+            left = geom.inner.left()
+            pixmap = self._icon_pixmap(s.icon, 24)
+            if pixmap is not None:
+                p.drawPixmap(left, geom.inner.top(), pixmap)
+                # El nombre se desplaza para dejar sitio al icono
+                left += 24 + 8
+            name_lefts.append(left)
+            bar = geom.bar
+            prog_w = bar.width() * s.vol // 100
+            if prog_w > 0:
+                p.drawPixmap(bar.left(), bar.top(), self._bar_fill(prog_w, bar.height()))
+
+        # Nombres
+        p.setPen(WHITE)
+        p.setFont(self._font_name)
+        for (geom, s), left in zip(cards, name_lefts):
+            # Hasta la zona del porcentaje / icono de mute (60 px a la derecha)
+            text, _, dy = self._name_text(s.name, geom.inner.right() - 60 - left)
+            p.drawStaticText(left, geom.inner.top() + dy, text)
+
+        # Porcentaje (alineado a la derecha y centrado en la franja de 22 px)
+        # o icono de mute (speaker con X)
+        p.setFont(self._font_vol)
+        for geom, s in cards:
+            right = geom.inner.right()
+            top = geom.inner.top()
+            if s.muted:
+                p.drawPixmap(right - 50, top, self._glyph('mute'))
+            else:
+                text, w, dy = self._static_text(self._vol_static, s.vol, VOL_TEXTS[s.vol], self._font_vol)
+                p.drawStaticText(right - w, top + dy, text)
+
     def _apply_click_through_win32(self):
         # Refuerza el click-through en Windows con estilos mínimos, sin tocar Layered (Qt lo gestiona)
         try:
             import win32gui, win32con
             hwnd = int(self.winId())
             ex = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-            ex |= (win32con.WS_EX_TRANSPARENT | win32con.WS_EX_NOACTIVATE)
-            win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, ex)
+            wanted = ex | win32con.WS_EX_TRANSPARENT | win32con.WS_EX_NOACTIVATE
+            if wanted != ex:
+                win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, wanted)
+            # Sin SWP_FRAMECHANGED: estos estilos no tocan el marco y así no
+            # se fuerza un WM_NCCALCSIZE ni recomponer la ventana
             win32gui.SetWindowPos(hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0,
-                                  win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_FRAMECHANGED)
+                                  win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE)
         except Exception:
             pass
 
     def _apply_position_from_config(self):
         """Calcula y aplica la posición desde la config (9 posiciones)"""
-        width, height = 420, 520
-        screen = QtWidgets.QApplication.primaryScreen().geometry()
-        pos = self.config.get('position', 'top-left')
-        offset_x = self.config.get('offset_x', 10)
-        offset_y = self.config.get('offset_y', 10)
-        
-        # 9 posiciones
-        if pos == 'top-left':
-            x, y = offset_x, offset_y
-        elif pos == 'top-center':
-            x, y = (screen.width() - width) // 2, offset_y
-        elif pos == 'top-right':
-            x, y = screen.width() - width - offset_x, offset_y
-        elif pos == 'middle-left':
-            x, y = offset_x, (screen.height() - height) // 2
-        elif pos == 'center':
-            x, y = (screen.width() - width) // 2, (screen.height() - height) // 2
-        elif pos == 'middle-right':
-            x, y = screen.width() - width - offset_x, (screen.height() - height) // 2
-        elif pos == 'bottom-left':
-            x, y = offset_x, screen.height() - height - offset_y
-        elif pos == 'bottom-center':
-            x, y = (screen.width() - width) // 2, screen.height() - height - offset_y
-        elif pos == 'bottom-right':
-            x, y = screen.width() - width - offset_x, screen.height() - height - offset_y
-        else:
-            x, y = offset_x, offset_y
-        
-        self.setGeometry(x, y, width, height)
+        ax, ay = _POSITION_ANCHORS.get(self.config.get('position', 'top-left'), (0, 0))
+        screen = self._screen_size
+        x = _anchored(ax, screen.width(), OVERLAY_W, self.config.get('offset_x', 10))
+        y = _anchored(ay, screen.height(), OVERLAY_H, self.config.get('offset_y', 10))
+        self.setGeometry(x, y, OVERLAY_W, OVERLAY_H)
+
+    def _on_screen_geometry(self, rect: QtCore.QRect) -> None:
+        self._screen_size = rect.size()
+        self._apply_position_from_config()
 
     def show_settings(self):
         """DEPRECATED: Usar requestSettings.emit() desde otros threads"""
@@ -373,7 +704,12 @@ class QtOverlay(QtWidgets.QWidget):
     
     def _show_settings_safe(self):
         """Muestra diálogo de configuración (thread-safe)"""
-        dialog = SettingsDialog(self.config, self.i18n, self)
+        # Se construye (widgets + hoja de estilo) solo la primera vez
+        dialog = self._settings_dialog
+        if dialog is None:
+            dialog = self._settings_dialog = SettingsDialog(self.config, self.i18n, self)
+        else:
+            dialog.set_config(self.config)
         if dialog.exec() == QtWidgets.QDialog.Accepted:
             new_config = dialog.get_config()
             old_lang = self.config.get('language', 'es')
@@ -387,6 +723,8 @@ class QtOverlay(QtWidgets.QWidget):
                 if old_lang != new_lang:
                     self.i18n.set_language(new_lang)
                     print(f"[I18N] Idioma cambiado a {new_lang}")
+                    self.update()
+                self.settingsSaved.emit()
                 # Actualizar step del controlador si cambió
                 if old_step != new_step and self.controller:
                     try:
@@ -400,10 +738,89 @@ class QtOverlay(QtWidgets.QWidget):
             else:
                 print("[CONFIG] Error al guardar configuración")
 
+# Opciones del diálogo de configuración, en el orden de sus combos
+# (mismo orden que _POSITION_ANCHORS: una sola lista de posiciones)
+SETTINGS_POSITIONS = tuple(_POSITION_ANCHORS)
+SETTINGS_LANGUAGES = ('es', 'en', 'fr', 'de', 'it', 'pt', 'ja', 'zh', 'ko', 'ru')
+# Valor de config -> índice del combo (lo desconocido cae en el primero)
+SETTINGS_POSITION_INDEX = {pos: i for i, pos in enumerate(SETTINGS_POSITIONS)}
+SETTINGS_LANGUAGE_INDEX = {lang: i for i, lang in enumerate(SETTINGS_LANGUAGES)}
+
+# Estilo del diálogo de configuración: una sola hoja para todo el diálogo
+SETTINGS_QSS = """
+    QDialog {
+        background: #1A1A1B;
+    }
+    QLabel {
+        font-size: 13px;
+        color: white;
+    }
+    QLabel#sectionLabel {
+        margin-top: 10px;
+    }
+    QLabel#stepValue {
+        min-width: 20px;
+    }
+    QComboBox {
+        background: #1E1E20;
+        color: white;
+        border: 2px solid #2D2D2F;
+        border-radius: 8px;
+        padding: 8px;
+        font-size: 13px;
+    }
+    QComboBox:hover {
+        border-color: white;
+    }
+    QComboBox::drop-down {
+        border: none;
+    }
+    QComboBox QAbstractItemView {
+        background: #1E1E20;
+        color: white;
+        selection-background-color: white;
+        selection-color: #1A1A1B;
+    }
+    QSlider::groove:horizontal {
+        background: #2D2D2F;
+        height: 6px;
+        border-radius: 3px;
+    }
+    QSlider::handle:horizontal {
+        background: white;
+        width: 16px;
+        margin: -5px 0;
+        border-radius: 8px;
+    }
+    QSlider::handle:horizontal:hover {
+        background: #E6E6E6;
+    }
+    QPushButton {
+        background: #2D2D2F;
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 10px 20px;
+        font-size: 13px;
+    }
+    QPushButton:hover {
+        background: #3D3D3F;
+    }
+    QPushButton#saveButton {
+        background: white;
+        color: #1A1A1B;
+        font-weight: bold;
+    }
+    QPushButton#saveButton:hover {
+        background: #E6E6E6;
+    }
+"""
+
 class SettingsDialog(QtWidgets.QDialog):
+    """Diálogo de configuración. Se crea una vez y se reutiliza (set_config)"""
+
     def __init__(self, config, i18n_instance, parent=None):
         super().__init__(parent)
-        self.config = config.copy()
         self.i18n = i18n_instance
         self.setWindowTitle("Configuración")
         self.setFixedSize(450, 480)
@@ -441,9 +858,8 @@ class SettingsDialog(QtWidgets.QDialog):
         layout.addWidget(icon_label, alignment=QtCore.Qt.AlignCenter)
         
         # Posición
-        pos_label = QtWidgets.QLabel(self.i18n.t('position_label'))
-        pos_label.setStyleSheet("font-size: 13px; color: white;")
-        layout.addWidget(pos_label)
+        self.pos_label = QtWidgets.QLabel()
+        layout.addWidget(self.pos_label)
         
         self.pos_combo = QtWidgets.QComboBox()
         self.pos_combo.addItems([
@@ -451,84 +867,32 @@ class SettingsDialog(QtWidgets.QDialog):
             "Medio Izquierda", "Centro", "Medio Derecha",
             "Abajo Izquierda", "Abajo Centro", "Abajo Derecha"
         ])
-        positions = [
-            'top-left', 'top-center', 'top-right',
-            'middle-left', 'center', 'middle-right',
-            'bottom-left', 'bottom-center', 'bottom-right'
-        ]
-        current_pos = config.get('position', 'top-left')
-        if current_pos in positions:
-            self.pos_combo.setCurrentIndex(positions.index(current_pos))
-        self.pos_combo.setStyleSheet("""
-            QComboBox {
-                background: #1E1E20;
-                color: white;
-                border: 2px solid #2D2D2F;
-                border-radius: 8px;
-                padding: 8px;
-                font-size: 13px;
-            }
-            QComboBox:hover {
-                border-color: white;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox QAbstractItemView {
-                background: #1E1E20;
-                color: white;
-                selection-background-color: white;
-                selection-color: #1A1A1B;
-            }
-        """)
         layout.addWidget(self.pos_combo)
         
         # Idioma
-        lang_label = QtWidgets.QLabel(self.i18n.t('language_label'))
-        lang_label.setStyleSheet("font-size: 13px; color: white; margin-top: 10px;")
-        layout.addWidget(lang_label)
+        self.lang_label = QtWidgets.QLabel()
+        self.lang_label.setObjectName("sectionLabel")
+        layout.addWidget(self.lang_label)
         
         self.lang_combo = QtWidgets.QComboBox()
         self.lang_combo.addItems([
             "Español", "English", "Français", "Deutsch", "Italiano",
             "Português", "日本語", "中文", "한국어", "Русский"
         ])
-        languages = ['es', 'en', 'fr', 'de', 'it', 'pt', 'ja', 'zh', 'ko', 'ru']
-        current_lang = config.get('language', 'es')
-        if current_lang in languages:
-            self.lang_combo.setCurrentIndex(languages.index(current_lang))
-        self.lang_combo.setStyleSheet(self.pos_combo.styleSheet())
         layout.addWidget(self.lang_combo)
         
         # Step de volumen
         step_label = QtWidgets.QLabel("Paso de volumen (2-10)")
-        step_label.setStyleSheet("font-size: 13px; color: white; margin-top: 10px;")
+        step_label.setObjectName("sectionLabel")
         layout.addWidget(step_label)
         
         step_container = QtWidgets.QHBoxLayout()
         self.step_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
         self.step_slider.setMinimum(2)
         self.step_slider.setMaximum(10)
-        self.step_slider.setValue(config.get('step', 4))
-        self.step_slider.setStyleSheet("""
-            QSlider::groove:horizontal {
-                background: #2D2D2F;
-                height: 6px;
-                border-radius: 3px;
-            }
-            QSlider::handle:horizontal {
-                background: white;
-                width: 16px;
-                margin: -5px 0;
-                border-radius: 8px;
-            }
-            QSlider::handle:horizontal:hover {
-                background: #E6E6E6;
-            }
-        """)
         
-        self.step_value = QtWidgets.QLabel(str(config.get('step', 4)))
-        self.step_value.setStyleSheet("font-size: 13px; color: white; min-width: 20px; text-align: center;")
+        self.step_value = QtWidgets.QLabel()
+        self.step_value.setObjectName("stepValue")
         self.step_value.setAlignment(QtCore.Qt.AlignCenter)
         
         self.step_slider.valueChanged.connect(lambda v: self.step_value.setText(str(v)))
@@ -542,55 +906,37 @@ class SettingsDialog(QtWidgets.QDialog):
         # Botones
         btn_layout = QtWidgets.QHBoxLayout()
         
-        cancel_btn = QtWidgets.QPushButton(self.i18n.t('cancel'))
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background: #2D2D2F;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 20px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background: #3D3D3F;
-            }
-        """)
-        cancel_btn.clicked.connect(self.reject)
+        self.cancel_btn = QtWidgets.QPushButton()
+        self.cancel_btn.clicked.connect(self.reject)
         
-        save_btn = QtWidgets.QPushButton(self.i18n.t('save'))
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background: white;
-                color: #1A1A1B;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 20px;
-                font-size: 13px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: #E6E6E6;
-            }
-        """)
-        save_btn.clicked.connect(self.accept)
+        self.save_btn = QtWidgets.QPushButton()
+        self.save_btn.setObjectName("saveButton")
+        self.save_btn.clicked.connect(self.accept)
         
-        btn_layout.addWidget(cancel_btn)
-        btn_layout.addWidget(save_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.save_btn)
         layout.addLayout(btn_layout)
         
-        # Estilo del diálogo
-        self.setStyleSheet("QDialog { background: #1A1A1B; }")
+        # Estilo del diálogo (se analiza una vez: el diálogo se reutiliza)
+        self.setStyleSheet(SETTINGS_QSS)
+        self.set_config(config)
+
+    def set_config(self, config):
+        """Carga config y los textos del idioma actual antes de mostrarlo"""
+        self.config = config.copy()
+        self.pos_label.setText(self.i18n.t('position_label'))
+        self.lang_label.setText(self.i18n.t('language_label'))
+        self.cancel_btn.setText(self.i18n.t('cancel'))
+        self.save_btn.setText(self.i18n.t('save'))
+        self.pos_combo.setCurrentIndex(SETTINGS_POSITION_INDEX.get(config.get('position', 'top-left'), 0))
+        self.lang_combo.setCurrentIndex(SETTINGS_LANGUAGE_INDEX.get(config.get('language', 'es'), 0))
+        step = config.get('step', 4)
+        self.step_slider.setValue(step)
+        self.step_value.setText(str(step))
     
     def get_config(self):
-        positions = [
-            'top-left', 'top-center', 'top-right',
-            'middle-left', 'center', 'middle-right',
-            'bottom-left', 'bottom-center', 'bottom-right'
-        ]
-        languages = ['es', 'en', 'fr', 'de', 'it', 'pt', 'ja', 'zh', 'ko', 'ru']
-        self.config['position'] = positions[self.pos_combo.currentIndex()]
-        self.config['language'] = languages[self.lang_combo.currentIndex()]
+        self.config['position'] = SETTINGS_POSITIONS[self.pos_combo.currentIndex()]
+        self.config['language'] = SETTINGS_LANGUAGES[self.lang_combo.currentIndex()]
         self.config['step'] = self.step_slider.value()
         return self.config
 
@@ -603,7 +949,10 @@ class SoundBoardUI:
         self.controller = controller
 
         # Crear QApplication si no existe
-        self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        self.app = QtWidgets.QApplication.instance()
+        if self.app is None:
+            _enable_gpu_backing_store()
+            self.app = QtWidgets.QApplication([])
         # Fuente por defecto
         self.app.setApplicationName("SoundBoard")
 
@@ -611,7 +960,8 @@ class SoundBoardUI:
 
         # Conectar callback para mostrar overlay (thread-safe, desde keyboard thread)
         if self.controller:
-            self.controller.ui_callback = lambda: self.win.requestShow.emit()
+            self.controller.ui_callback = self.win.request_show
+            self.controller.change_callback = self.win.publish_snapshot
 
     def run(self):
         self.app.exec()
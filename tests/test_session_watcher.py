@@ -0,0 +1,61 @@
+"""Callbacks de SessionWatcher con los argumentos que les pasa pycaw"""
+
+import os
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import backend  # noqa: E402
+
+
+def _fake_pycaw():
+    """pycaw.callbacks mínimo: solo las clases base que heredan los callbacks"""
+    callbacks = types.ModuleType("pycaw.callbacks")
+    callbacks.AudioSessionNotification = type("AudioSessionNotification", (), {})
+    callbacks.AudioSessionEvents = type("AudioSessionEvents", (), {})
+    pycaw = types.ModuleType("pycaw")
+    pycaw.callbacks = callbacks
+    return {"pycaw": pycaw, "pycaw.callbacks": callbacks}
+
+
+class SessionCallbacksTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _fake_pycaw())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Igual que media_wheel: notify es un Event.set, que no admite argumentos
+        self.changed = threading.Event()
+        self.created_cls, self.events_cls = backend._session_callbacks(self.changed.set)
+
+    def _assert_notifies(self, callback, *args):
+        self.changed.clear()
+        callback(*args)
+        self.assertTrue(self.changed.is_set())
+
+    def test_session_created(self):
+        client = self.created_cls()
+        self._assert_notifies(client.on_session_created, object())
+
+    def test_simple_volume_changed(self):
+        events = self.events_cls()
+        self._assert_notifies(events.on_simple_volume_changed, 0.5, 0, None)
+
+    def test_state_changed(self):
+        events = self.events_cls()
+        self._assert_notifies(events.on_state_changed, "Active", 1)
+
+    def test_session_disconnected(self):
+        events = self.events_cls()
+        self._assert_notifies(events.on_session_disconnected, "DeviceRemoval", 0)
+
+    def test_without_pycaw(self):
+        with mock.patch.dict(sys.modules, {"pycaw": None, "pycaw.callbacks": None}):
+            self.assertIsNone(backend._session_callbacks(self.changed.set))
+
+
+if __name__ == "__main__":
+    unittest.main()